@@ -1,18 +1,17 @@
 import os
 import sys
-import osr
 
-from osgeo import gdal, ogr
-from shapely.geometry.polygon import Polygon
+from osgeo import gdal
 
 # utility functions
 sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
 from fs import getFileList, getFile
+from grid import AoiGrid
 
 
-class Clipper:
+class Clipper( AoiGrid ):
 
-    def __init__( self ):
+    def __init__( self, native=False, cutline=False ):
 
         """
         Placeholder
@@ -22,7 +21,8 @@ class Clipper:
         os.environ['GDAL_CACHEMAX'] = '2048'
         gdal.UseExceptions()
 
-        self._epsg = 28412
+        # aoi windows locked to 30m grid - optionally clipped in source crs and masked by aoi polygon
+        super().__init__( 30, native=native, cutline=cutline )
 
         return
 
@@ -35,133 +35,67 @@ class Clipper:
 
         aoi_paths = []
 
-        # get exported geotiff list
-        files = getFileList( scene_path, ext )
-        for f in files: 
-
-            # open image
-            ds = gdal.Open( f )
-            if ds is not None:
-
-                # get aoi to image transform
-                extent = self.getExtent ( ds )
-                coord_tx = self.getCoordinateTransform( ds )
+        # clip each image / aoi task in turn
+        for task in self.getTasks( scene_path, aois, distance=distance, ext=ext ):
 
-                # for each aoi
-                for aoi in aois:
-
-                    # get buffered bounding box coordinates
-                    bbox = self.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_image' ], distance=distance )
-                    if self.overlapsScene( extent, bbox ) is True:
-
-                        # create aoi sub-path
-                        aoi_path = os.path.join( scene_path, aoi[ 'name'] + '/' )
-                        if not os.path.exists( aoi_path ):
-                            os.makedirs(aoi_path, 0o755 )
-
-                        # generate aoi sub-image aligned with bbox
-                        aoi_pathname = os.path.join( aoi_path, os.path.basename( f ) )
-                        print ( 'Creating AoI image: {}'.format( aoi_pathname ) )
-
-                        # reproject bbox to local utm - setup warp options
-                        bbox = self.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_local' ], distance=distance )
-                        options = '-t_srs EPSG:{} -tr 15 -15 -te {} {} {} {}'. format ( self._epsg, bbox[ 'ulx'], bbox[ 'lry' ], bbox[ 'lrx' ], bbox[ 'uly'] )
-
-                        gdal.Warp( aoi_pathname, ds, options=options )
-
-                        # record aoi image location
-                        aoi_paths.append ( aoi_path )
+            self.clip( task )
+            aoi_paths.append ( task[ 'aoi_path' ] )
 
         return list( set( aoi_paths ) )
 
 
-    def getExtent( self, ds ):
+    def getTasks( self, scene_path, aois, distance=100, ext='*_reflectance.tif' ):
 
         """
         Placeholder
         """
 
-        # create transform
-        geo = ds.GetGeoTransform()
-        return { 
-                    'ulx' : geo[ 0 ],
-                    'uly' : geo[ 3 ],
-                    'lrx' : geo[ 0 ] + ( ds.RasterXSize * geo[ 1 ] ),
-                    'lry' : geo[ 3 ] + ( ds.RasterYSize * geo[ 5 ] )
-        }    
+        tasks = []
 
+        # get exported geotiff list
+        files = getFileList( scene_path, ext )
+        for f in files: 
 
-    def getCoordinateTransform( self, ds ):
+            # open image
+            ds = gdal.Open( f )
+            if ds is not None:
 
-        """
-        Placeholder
-        """
+                # get extent and aoi windows - computed once per image grid
+                context = self.getSceneContext( ds, aois, distance=distance )
 
-        # retrieve srs from image
-        image = osr.SpatialReference( wkt=ds.GetProjection() )
+                # one task per overlapping aoi
+                for window in context[ 'windows' ]:
 
-        # aoi in lat / lon
-        aoi = osr.SpatialReference()
-        aoi.ImportFromEPSG( 4326 )
+                    if window[ 'overlaps' ] is True:
+                        tasks.append( { 'sources' : [ f ], 
+                                        'window' : window, 
+                                        'aoi_path' : os.path.join( scene_path, window[ 'aoi' ][ 'name'] + '/' ) } )
 
-        # output in local utm
-        local = osr.SpatialReference()
-        local.ImportFromEPSG( self._epsg )
+                ds = None
 
-        # create transform
-        return { 'aoi_image' : osr.CoordinateTransformation( aoi, image ), 
-                    'aoi_local' : osr.CoordinateTransformation( aoi, local ) }
+        return tasks
 
 
-    def getBoundingBox( self, aoi, coord_tx, distance=100 ):
+    def clip( self, task ):
 
         """
         Placeholder
         """
 
-        # sort lat / lon min and max
-        lat = [ min ( aoi[ 0 ], aoi[ 2 ] ), max( aoi[ 0 ], aoi[ 2 ] ) ]
-        lon = [ min ( aoi[ 1 ], aoi[ 3 ] ), max( aoi[ 1 ], aoi[ 3 ] ) ]
-
-        # transform lat / lon to image crs
-        ulx, uly, ulz = coord_tx.TransformPoint( lon[ 0 ], lat[ 1 ] )
-        lrx, lry, lrz = coord_tx.TransformPoint( lon[ 1 ], lat[ 0 ] )
+        # create aoi sub-path
+        aoi_path = task[ 'aoi_path' ]
+        if not os.path.exists( aoi_path ):
+            os.makedirs(aoi_path, 0o755, exist_ok=True )
 
-        # lock to 30m grid
-        ulx = ulx + ( 30.0 - ulx % 30 )
-        uly = uly + ( 30.0 - uly % 30 )
-
-        lrx = lrx + ( 30.0 - lrx % 30 )
-        lry = lry + ( 30.0 - lry % 30 )
-
-        # return bbox window
-        return {
-                    'ulx' : ulx - distance, 
-                    'uly' : uly + distance, 
-                    'lrx' : lrx + distance, 
-                    'lry' : lry - distance 
-        }
-
-
-    def overlapsScene( self, extent, bbox ):
-
-        """
-        Placeholder
-        """
+        # generate aoi sub-image aligned with bbox
+        f = task[ 'sources' ][ 0 ]
+        aoi_pathname = os.path.join( aoi_path, os.path.basename( f ) )
+        print ( 'Creating AoI image: {}'.format( aoi_pathname ) )
 
-        # create scene extent polygon
-        p1 = Polygon( [ ( extent[ 'ulx' ], extent[ 'uly' ] ),
-                        ( extent[ 'lrx' ], extent[ 'uly' ] ),
-                        ( extent[ 'lrx' ], extent[ 'lry' ] ),
-                        ( extent[ 'ulx' ], extent[ 'lry' ] ),
-                        ( extent[ 'ulx' ], extent[ 'uly' ] ) ] )
-        
-        # create aoi polygon
-        p2 = Polygon( [ ( bbox[ 'ulx' ], bbox[ 'uly' ] ),
-                        ( bbox[ 'lrx' ], bbox[ 'uly' ] ),
-                        ( bbox[ 'lrx' ], bbox[ 'lry' ] ),
-                        ( bbox[ 'ulx' ], bbox[ 'lry' ] ),
-                        ( bbox[ 'ulx' ], bbox[ 'uly' ] ) ] )
-        
-        return p1.intersects( p2 )
+        # target grid in local utm or source crs - window read where grids align
+        ds = gdal.Open( f )
+        target = self.getTarget( ds, task[ 'window' ], 15 )
+        self.clipImage( ds, aoi_pathname, target )
 
+        ds = None
+        return [ aoi_pathname ]
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import xmltodict
+
+from shapely.geometry.polygon import Polygon
+from meta import parseMetaFile, getSceneCoverage
+
+sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
+from fs import getFileList
+
+
+def parseLegacy( content ):
+
+    """
+    Placeholder
+    """
+
+    # full dict tree - as per original readRemoteMetaFile / getSceneCoverage
+    doc = xmltodict.parse( content )
+    container = doc[ 'GranuleMetaDataFile' ][ 'GranuleURMetaData' ][ 'SpatialDomainContainer' ][ 'HorizontalSpatialDomainContainer' ]
+
+    points = [ ( float( p[ 'PointLongitude' ] ), float( p[ 'PointLatitude' ] ) ) for p in container[ 'GPolygon' ][ 'Boundary' ][ 'Point' ] ]
+    cov = Polygon( points[ 0:4 ] + points[ 0:1 ] )
+
+    # re-serialise for writing to disk
+    xmltodict.unparse( doc, pretty=True )
+    return cov
+
+
+def parseStreaming( content ):
+
+    """
+    Placeholder
+    """
+
+    # iterparse footprint - original bytes written unchanged
+    return getSceneCoverage( parseMetaFile( content ) )
+
+
+def measure( fn, corpus, repeat ):
+
+    """
+    Placeholder
+    """
+
+    # time parse over corpus
+    start = time.perf_counter()
+    for i in range( repeat ):
+        for content in corpus:
+            fn( content )
+
+    elapsed = time.perf_counter() - start
+
+    # peak allocation for single pass
+    tracemalloc.start()
+    for content in corpus:
+        fn( content )
+
+    peak = tracemalloc.get_traced_memory()[ 1 ]
+    tracemalloc.stop()
+
+    return { 'ms' : elapsed * 1000.0 / ( repeat * len( corpus ) ), 'peak' : peak / 1024.0 }
+
+
+def parseArguments(args=None):
+
+    """
+    Placeholder
+    """
+
+    # parse command line arguments
+    parser = argparse.ArgumentParser(description='aster metadata parse benchmark')
+    parser.add_argument('path', action="store", help='folder of AST_L1T .hdf.xml files')
+    parser.add_argument('-n', '--repeat', action="store", type=int, default=10 )
+
+    return parser.parse_args(args)
+
+
+def main():
+
+    """
+    Placeholder
+    """
+
+    # parse arguments
+    args = parseArguments()
+
+    # load corpus into memory
+    corpus = []
+    for pathname in getFileList( args.path, '*.xml' ):
+        with open( pathname, 'rb' ) as f:
+            corpus.append( f.read() )
+
+    if len( corpus ) == 0:
+        print ( 'No xml files found in path: {}'.format( args.path ) )
+        return
+
+    # check footprints agree before timing
+    for content in corpus:
+        if not parseLegacy( content ).equals( parseStreaming( content ) ):
+            print ( 'Footprint mismatch between parsers' )
+            return
+
+    print ( 'Corpus: {} files'.format( len( corpus ) ) )
+    for name, fn in [ ( 'xmltodict', parseLegacy ), ( 'iterparse', parseStreaming ) ]:
+
+        result = measure( fn, corpus, args.repeat )
+        print ( '{:<10} {:8.3f} ms/file {:10.1f} KiB peak'.format( name, result[ 'ms' ], result[ 'peak' ] ) )
+
+    return
+
+# execute main
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import os
+import time
+import sqlite3
+
+
+class Catalog:
+
+    def __init__( self, pathname ):
+
+        """
+        Placeholder
+        """
+
+        # create catalog path
+        path = os.path.dirname( pathname )
+        if path and not os.path.exists( path ):
+            os.makedirs( path, 0o755 )
+
+        # open database and create schema
+        self._db = sqlite3.connect( pathname )
+        self._db.row_factory = sqlite3.Row
+
+        with self._db:
+            self._db.executescript( """
+                CREATE TABLE IF NOT EXISTS folders (
+                    name TEXT PRIMARY KEY,
+                    listed REAL
+                );
+                CREATE TABLE IF NOT EXISTS granules (
+                    name TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    hour INTEGER NOT NULL,
+                    footprint TEXT,
+                    meta TEXT,
+                    state TEXT
+                );
+                CREATE INDEX IF NOT EXISTS granules_folder ON granules ( folder );
+            """ )
+
+            # listing time added after first catalog release
+            columns = [ row[ 'name' ] for row in self._db.execute( 'PRAGMA table_info( folders )' ) ]
+            if 'listed' not in columns:
+                self._db.execute( 'ALTER TABLE folders ADD COLUMN listed REAL' )
+
+        return
+
+
+    def hasFolder( self, folder ):
+
+        """
+        Placeholder
+        """
+
+        # check folder listing already recorded
+        row = self._db.execute( 'SELECT name FROM folders WHERE name = ?', ( folder, ) ).fetchone()
+        return row is not None
+
+
+    def getListingTime( self, folder ):
+
+        """
+        Placeholder
+        """
+
+        # epoch time of last folder listing - none if unknown or recorded before listing times were kept
+        row = self._db.execute( 'SELECT listed FROM folders WHERE name = ?', ( folder, ) ).fetchone()
+        return row[ 'listed' ] if row is not None else None
+
+
+    def addFolder( self, folder, granules ):
+
+        """
+        Placeholder
+        """
+
+        # record granules listed in remote folder - keep existing footprints and states
+        with self._db:
+            self._db.executemany( 'INSERT OR IGNORE INTO granules ( name, folder, url, hour ) VALUES ( ?, ?, ?, ? )',
+                                    [ ( g[ 'name' ], folder, g[ 'url' ], g[ 'hour' ] ) for g in granules ] )
+
+            self._db.execute( 'INSERT OR REPLACE INTO folders ( name, listed ) VALUES ( ?, ? )', ( folder, time.time() ) )
+
+        return
+
+
+    def getGranules( self, folder ):
+
+        """
+        Placeholder
+        """
+
+        # get granules recorded for folder
+        rows = self._db.execute( 'SELECT * FROM granules WHERE folder = ? ORDER BY name', ( folder, ) ).fetchall()
+        return [ dict( row ) for row in rows ]
+
+
+    def getFootprints( self ):
+
+        """
+        Placeholder
+        """
+
+        # get all granules with known footprint
+        rows = self._db.execute( 'SELECT name, folder, url, hour, footprint, state FROM granules WHERE footprint IS NOT NULL ORDER BY folder, name' ).fetchall()
+        return [ dict( row ) for row in rows ]
+
+
+    def setMetadata( self, name, footprint, meta ):
+
+        """
+        Placeholder
+        """
+
+        # record footprint wkt and metadata content
+        with self._db:
+            self._db.execute( 'UPDATE granules SET footprint = ?, meta = ? WHERE name = ?', ( footprint, meta, name ) )
+
+        return
+
+
+    def setState( self, name, state ):
+
+        """
+        Placeholder
+        """
+
+        # record download state
+        with self._db:
+            self._db.execute( 'UPDATE granules SET state = ? WHERE name = ?', ( state, name ) )
+
+        return
+
+
+    def close( self ):
+
+        """
+        Placeholder
+        """
+
+        # close database
+        self._db.close()
+        return
@@ -1,17 +1,26 @@
 import os
 import sys
+import time
+import hashlib
 import requests
-import xmltodict
 
 from netrc import netrc
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 from shapely.geometry.polygon import Polygon
+from shapely import wkt
+
+from catalog import Catalog
+from meta import parseMetaFile, getSceneCoverage
+from transfer import TransferQueue
 
 
 class Downloader:
 
-    def __init__(self, root_path='/data/raw/tau-ken/25994' ):
+    def __init__(self, root_path='/data/raw/tau-ken/25994', root_url=None, workers=1, pool_size=None, retries=3, backoff=0.5, catalog=None, downloads=1, rate=None, chunk_size=1024 * 1024, refresh=7 ):
 
         """
         Placeholder
@@ -19,12 +28,46 @@ class Downloader:
 
         # get root + authentication url
         self._root_url = "https://e4ftl01.cr.usgs.gov/ASTER_B/ASTT/AST_L1T.003"
+        if root_url is not None:
+            self._root_url = root_url.rstrip( '/' )
+
         self._urs = 'urs.earthdata.nasa.gov' 
 
-        # resolve earthdata authentication
+        # maximum number of concurrent scraping requests
+        self._workers = max( 1, workers )
+
+        # concurrent download workers, global bytes per second cap and read chunk size
+        self._downloads = max( 1, downloads )
+        self._rate = rate
+        self._chunk_size = chunk_size
+
+        # resolve earthdata authentication once
         self._netrcDir = os.path.expanduser("~/.netrc")
         self._root_path = root_path
 
+        credentials = netrc(self._netrcDir).authenticators(self._urs)
+
+        # keep-alive session with connection pool sized to concurrency and retry / backoff on transient errors
+        if pool_size is None:
+            pool_size = self._workers + self._downloads
+
+        retry = Retry( total=retries, backoff_factor=backoff, status_forcelist=[ 429, 500, 502, 503, 504 ] )
+        self._adapter = HTTPAdapter( pool_connections=4, pool_maxsize=pool_size, max_retries=retry )
+
+        self._session = requests.Session()
+        self._session.auth = ( credentials[0], credentials[2] )
+        self._session.mount( 'https://', self._adapter )
+        self._session.mount( 'http://', self._adapter )
+
+        # persistent granule catalog - avoids re-reading metadata on repeat runs
+        if catalog is None:
+            catalog = os.path.join( root_path, 'catalog.db' )
+
+        self._catalog = Catalog( catalog )
+
+        # days after acquisition during which folder listings may still gain granules
+        self._refresh = refresh
+
         return
 
 
@@ -45,57 +88,124 @@ class Downloader:
             ( bbox[ 'ulx' ], bbox[ 'lry' ] ),
             ( bbox[ 'ulx' ], bbox[ 'uly' ] ) ] )
 
-        # between start and end dates
+        # collect daily sub-folder urls between start and end dates
+        dates = []
         epoch = start_epoch
         while epoch < end_epoch:
 
-            # construct subfolder names
-            current_date = datetime.fromtimestamp(epoch)
-            sub_folder = current_date.strftime("%Y.%m.%d")
+            dates.append( datetime.fromtimestamp(epoch) )
+            epoch += 60 * 60 * 24
+
+        folders = [ d.strftime("%Y.%m.%d") for d in dates ]
+        urls = [ '{}/{}/'.format ( self._root_url, folder ) for folder in folders ]
+
+        # downloads proceed in background while scraping continues
+        transfer = TransferQueue( self, workers=self._downloads, rate=self._rate )
+        with ThreadPoolExecutor( max_workers=self._workers ) as pool:
+
+            # fetch listings of folders missing from catalog or listed too soon after acquisition concurrently
+            listings = { url : pool.submit( self.getRemoteFileList, url, '.xml' ) 
+                            for folder, url in zip( folders, urls ) if not self.isListingFinal( folder ) }
 
-            # get metadata file list from remote directory
-            url = '{}/{}/'.format ( self._root_url, sub_folder )
-            meta_files = self.getRemoteFileList( url, '.xml' )
+            for current_date, folder, url in zip( dates, folders, urls ):
 
-            print('Scraping: {}'.format( url ) )
-            for f in meta_files:
+                # record remote listing in catalog
+                if url in listings:
 
-                # parse hour from remote filename
-                tokens = os.path.basename(f).split('_' )
-                aos_time = int( tokens[2][-6:-4] )
+                    print('Scraping: {}'.format( url ) )
+                    meta_files = listings.pop( url ).result()
+                    if len( meta_files ) > 0:
+                        self._catalog.addFolder( folder, [ {   'name' : self.getGranuleName( f ),
+                                                                'url' : f,
+                                                                'hour' : self.getAcquisitionHour( f ) } for f in meta_files ] )
 
-                # apply constraint
-                if aos_time >= args.start_hour and aos_time <= args.end_hour:
+                # apply hour constraint to catalogued granules
+                granules = [ g for g in self._catalog.getGranules( folder ) if args.start_hour <= g[ 'hour' ] <= args.end_hour ]
 
-                    # read remote meta data into dict
-                    doc = self.readRemoteMetaFile( f ) 
-                    if doc is not None:
+                # read unseen remote meta data concurrently and record footprints
+                unseen = [ g for g in granules if g[ 'footprint' ] is None ]
+                for g, content in zip( unseen, pool.map( lambda g: self.readRemoteMetaFile( g[ 'url' ] ), unseen ) ):
+                    if content is not None:
+
+                        g[ 'footprint' ] = getSceneCoverage( parseMetaFile( content ) ).wkt
+                        g[ 'meta' ] = content
+                        self._catalog.setMetadata( g[ 'name' ], g[ 'footprint' ], g[ 'meta' ] )
+
+                for g in granules:
+                    if g[ 'footprint' ] is not None:
 
                         # get boundary polygon
-                        cov = self.getSceneCoverage( doc )
+                        cov = wkt.loads( g[ 'footprint' ] )
                         if cov.intersects( aoi ):
 
                             # create raw folder
+                            tokens = g[ 'name' ].split('_' )
                             raw_folder = os.path.join( self._root_path, current_date.strftime("%Y%m%d") + '_' + tokens[2][-6: ] )
+
+                            # skip granules already downloaded
+                            dataset = os.path.basename( g[ 'url' ] ).replace( '.hdf.xml', '.hdf' )
+                            if g[ 'state' ] == 'downloaded' and os.path.exists( os.path.join( raw_folder, dataset ) ):
+                                continue
+
                             if not os.path.exists( raw_folder ):
                                 os.makedirs( raw_folder, 0o755 )
 
-                            # write meta to file
-                            with open( os.path.join( raw_folder, os.path.basename( f ) ), 'w+' ) as meta:
-                                meta.write( xmltodict.unparse( doc, pretty=True ))
+                            # write original meta content to file - text if catalogued before bytes were kept
+                            content = g[ 'meta' ] if isinstance( g[ 'meta' ], bytes ) else g[ 'meta' ].encode( 'utf-8' )
+                            with open( os.path.join( raw_folder, os.path.basename( g[ 'url' ] ) ), 'wb' ) as meta:
+                                meta.write( content )
 
-                            # write dataset to file
-                            dataset = os.path.basename(f).replace( '.hdf.xml', '.hdf' )
-                            url = os.path.join( os.path.dirname( f ), dataset )
+                            # enqueue dataset download
+                            info = parseMetaFile( content )[ 'files' ].get( dataset )
+                            transfer.put( g[ 'name' ], os.path.join( os.path.dirname( g[ 'url' ] ), dataset ), os.path.join( raw_folder, dataset ), info=info )
 
-                            self.getDataset( url, os.path.join( raw_folder, dataset ) )
-
-            # move onto next day
-            epoch += 60 * 60 * 24
+        # wait for downloads and record state
+        for job, result in transfer.join():
+            if result is True:
+                self._catalog.setState( job[ 'name' ], 'downloaded' )
 
         return
 
 
+    def isListingFinal( self, folder ):
+
+        """
+        Placeholder
+        """
+
+        # unlisted folder
+        if not self._catalog.hasFolder( folder ):
+            return False
+
+        # listing made at least refresh days after acquisition date will not gain granules
+        listed = self._catalog.getListingTime( folder )
+        if listed is None:
+            listed = time.time()
+
+        return listed - datetime.strptime( folder, '%Y.%m.%d' ).timestamp() >= self._refresh * 60 * 60 * 24
+
+
+    def getGranuleName( self, f ):
+
+        """
+        Placeholder
+        """
+
+        # strip metadata and dataset extensions from remote filename
+        return os.path.basename( f ).replace( '.hdf.xml', '' )
+
+
+    def getAcquisitionHour( self, f ):
+
+        """
+        Placeholder
+        """
+
+        # parse hour from remote filename
+        tokens = os.path.basename(f).split('_' )
+        return int( tokens[2][-6:-4] )
+
+
     def getRemoteFileList( self, url, ext ):
 
         """
@@ -103,10 +213,7 @@ class Downloader:
         """
 
         # parse html listing
-        page = requests.get(    url, 
-                                stream=True, 
-                                auth=(netrc(self._netrcDir).authenticators(self._urs)[0], 
-                                        netrc(self._netrcDir).authenticators(self._urs)[2])).text
+        page = self._session.get( url, stream=True ).text
 
         soup = BeautifulSoup( page, 'html.parser' )
         return [url + '/' + node.get('href') for node in soup.find_all('a') if node.get('href').endswith(ext)]
@@ -118,67 +225,127 @@ class Downloader:
         Placeholder
         """
 
-        # retrieve remote meta file
-        content = requests.get( f, stream=True, 
-            auth=(netrc(self._netrcDir).authenticators(self._urs)[0], netrc(self._netrcDir).authenticators(self._urs)[2])).text
+        # retrieve remote meta file as original bytes
+        content = None
+
+        response = self._session.get( f )
+        if response.status_code == 200:
+            content = response.content
 
-        # load meta xml into dict
-        return xmltodict.parse( content )
+        return content
 
 
-    def getSceneCoverage( self, doc ):
+    def getDataset( self, url, local_pathname, info=None, callback=None ):
 
         """
         Placeholder
         """
 
-        # parse boundary points from xml
-        container = doc[ 'GranuleMetaDataFile' ][ 'GranuleURMetaData' ][ 'SpatialDomainContainer' ][ 'HorizontalSpatialDomainContainer' ]
+        result = False
 
-        extent = []
-        for schema in container[ 'GPolygon' ][ 'Boundary' ][ 'Point' ]:
-            extent.append( { 'lon' : float( schema[ 'PointLongitude' ] ), 
-                            'lat' : float( schema[ 'PointLatitude' ] ) } )
+        # skip datasets already downloaded - renamed only once verified
+        if os.path.exists( local_pathname ) and self.checkDataset( local_pathname, info, checksum=False ):
+            print('Dataset exists - ignoring... {}'.format( local_pathname ) )
+            return True
 
-        # return polygon
-        return Polygon( [ ( extent[ 0 ][ 'lon' ], extent[ 0 ][ 'lat' ] ),
-                    ( extent[ 1 ][ 'lon' ], extent[ 1 ][ 'lat' ] ),
-                    ( extent[ 2 ][ 'lon' ], extent[ 2 ][ 'lat' ] ),
-                    ( extent[ 3 ][ 'lon' ], extent[ 3 ][ 'lat' ] ),
-                    ( extent[ 0 ][ 'lon' ], extent[ 0 ][ 'lat' ] ) ] )
-                    
+        # resume partial download from end of part file
+        part_pathname = local_pathname + '.part'
 
-    def getDataset( self, url, local_pathname ):
+        offset = os.path.getsize( part_pathname ) if os.path.exists( part_pathname ) else 0
+        if info is not None and info[ 'size' ] is not None and offset > info[ 'size' ]:
+            offset = 0
 
-        """
-        Placeholder
-        """
+        headers = { 'Range' : 'bytes={}-'.format( offset ) } if offset > 0 else None
 
         # submit request and download file
         print('Downloading file: {} -> {}'.format(url, os.path.dirname( local_pathname )))
-        with requests.get( url, stream=True, auth=(netrc(self._netrcDir).authenticators(self._urs)[0], 
-                                    netrc(self._netrcDir).authenticators(self._urs)[2])) as response:
+        with self._session.get( url, stream=True, headers=headers ) as response:
 
-            # status ok
-            if response.status_code == 200:
+            # status ok - append if server honoured range request
+            if response.status_code in [ 200, 206 ]:
 
                 response.raw.decode_content = True
                 content = response.raw
 
-                # write content to file in chunks
-                with open( local_pathname, 'wb') as d:
+                # write content to part file in chunks
+                with open( part_pathname, 'ab' if response.status_code == 206 else 'wb' ) as d:
                     while True:
-                        chunk = content.read(16 * 1024)
+                        chunk = content.read( self._chunk_size )
                         if not chunk:
                             break
                         d.write(chunk)
 
-                # report success
-                print('Downloaded OK!' )
-            else:
-                
-                # error returned from server
+                        if callback is not None:
+                            callback( len( chunk ) )
+
+            elif response.status_code != 416:
+
+                # error returned from server - 416 implies part file already complete
                 print('Download Error {}'.format(response.status_code ) )
+                return result
 
-        return
+        # verify size and checksum before moving into place
+        if self.checkDataset( part_pathname, info ):
+
+            os.replace( part_pathname, local_pathname )
+            print('Downloaded OK!' )
+            result = True
+
+        else:
+
+            # discard part file if complete but corrupt - else keep for resume
+            print('Integrity check failed: {}'.format( part_pathname ) )
+            if info is None or info[ 'size' ] is None or os.path.getsize( part_pathname ) >= info[ 'size' ]:
+                os.remove( part_pathname )
+
+        return result
+
+
+    def checkDataset( self, pathname, info, checksum=True ):
+
+        """
+        Placeholder
+        """
+
+        # no reference information
+        if info is None:
+            return os.path.exists( pathname )
+
+        # check size
+        if info[ 'size' ] is not None and os.path.getsize( pathname ) != info[ 'size' ]:
+            return False
+
+        # check digest where algorithm supported - e.g. posix cksum is not
+        if checksum and info[ 'checksum' ] and info[ 'checksum_type' ] and info[ 'checksum_type' ].lower() in hashlib.algorithms_available:
+
+            digest = hashlib.new( info[ 'checksum_type' ].lower() )
+            with open( pathname, 'rb' ) as f:
+                for block in iter( lambda: f.read( 1024 * 1024 ), b'' ):
+                    digest.update( block )
+
+            if digest.hexdigest().lower() != info[ 'checksum' ].strip().lower():
+                return False
+
+        return True
+
+
+    def getConnectionStats( self ):
+
+        """
+        Placeholder
+        """
+
+        # sum connection and request counts over host pools
+        stats = { 'opened' : 0, 'requests' : 0 }
+
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+
+            pool = pools[ key ]
+            if pool is not None:
+                stats[ 'opened' ] += pool.num_connections
+                stats[ 'requests' ] += pool.num_requests
 
+        # requests not requiring a new connection were served by a pooled keep-alive connection
+        stats[ 'reused' ] = max( 0, stats[ 'requests' ] - stats[ 'opened' ] )
+        return stats
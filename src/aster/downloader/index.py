@@ -0,0 +1,62 @@
+import numpy as np
+
+from shapely import wkt
+from shapely.strtree import STRtree
+
+
+class SceneIndex:
+
+    def __init__( self, catalog ):
+
+        """
+        Placeholder
+        """
+
+        # load catalogued footprints
+        self._granules = catalog.getFootprints()
+        self._footprints = [ wkt.loads( g[ 'footprint' ] ) for g in self._granules ]
+
+        # build r-tree over footprints - shapely returns integer indices into footprint list
+        self._tree = STRtree( self._footprints ) if len( self._footprints ) > 0 else None
+
+        # folder names sort chronologically
+        self._folders = np.asarray( [ g[ 'folder' ] for g in self._granules ] )
+        self._hours = np.asarray( [ g[ 'hour' ] for g in self._granules ] )
+
+        return
+
+
+    def __len__( self ):
+
+        """
+        Placeholder
+        """
+
+        return len( self._granules )
+
+
+    def query( self, aoi, start_date=None, end_date=None, start_hour=0, end_hour=23 ):
+
+        """
+        Placeholder
+        """
+
+        result = []
+        if self._tree is not None:
+
+            # get granules with footprints intersecting aoi
+            idx = np.asarray( self._tree.query( aoi, predicate='intersects' ), dtype=int )
+
+            # apply date constraint - end date is exclusive as per scraping
+            if start_date is not None:
+                idx = idx[ self._folders[ idx ] >= start_date.strftime( '%Y.%m.%d' ) ]
+
+            if end_date is not None:
+                idx = idx[ self._folders[ idx ] < end_date.strftime( '%Y.%m.%d' ) ]
+
+            # apply hour constraint
+            idx = idx[ ( self._hours[ idx ] >= start_hour ) & ( self._hours[ idx ] <= end_hour ) ]
+
+            result = [ self._granules[ i ] for i in sorted( idx ) ]
+
+        return result
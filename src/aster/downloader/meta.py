@@ -0,0 +1,67 @@
+import io
+import xml.etree.ElementTree as ET
+
+from shapely.geometry.polygon import Polygon
+
+
+def parseMetaFile( content ):
+
+    """
+    Placeholder
+    """
+
+    # fields extracted from ecs granule xml
+    meta = { 'points' : [], 'date' : None, 'hour' : None, 'files' : {} }
+
+    point = {}
+    container = {}
+
+    # stream elements - cleared once consumed to bound memory
+    for event, elem in ET.iterparse( io.BytesIO( content ), events=( 'end', ) ):
+
+        # drop any namespace prefix
+        tag = elem.tag.rsplit( '}', 1 )[ -1 ]
+        if tag in [ 'PointLongitude', 'PointLatitude' ]:
+            point[ tag ] = float( elem.text )
+
+        elif tag == 'Point':
+            if 'PointLongitude' in point and 'PointLatitude' in point:
+                meta[ 'points' ].append( ( point[ 'PointLongitude' ], point[ 'PointLatitude' ] ) )
+            point = {}
+
+        elif tag in [ 'CalendarDate', 'RangeBeginningDate' ] and meta[ 'date' ] is None:
+            meta[ 'date' ] = elem.text.strip()
+
+        elif tag in [ 'TimeofDay', 'RangeBeginningTime' ] and meta[ 'hour' ] is None:
+            meta[ 'hour' ] = int( elem.text.strip()[ 0:2 ] )
+
+        elif tag in [ 'DistributedFileName', 'FileSize', 'Checksum', 'ChecksumType' ]:
+            container[ tag ] = elem.text.strip() if elem.text is not None else None
+
+        elif tag == 'DataFileContainer':
+
+            # record expected size and checksum of data file
+            if container.get( 'DistributedFileName' ):
+                meta[ 'files' ][ container[ 'DistributedFileName' ] ] = {
+                            'size' : int( container[ 'FileSize' ] ) if container.get( 'FileSize' ) else None,
+                            'checksum' : container.get( 'Checksum' ),
+                            'checksum_type' : container.get( 'ChecksumType' ) }
+            container = {}
+
+        else:
+            continue
+
+        elem.clear()
+
+    return meta
+
+
+def getSceneCoverage( meta ):
+
+    """
+    Placeholder
+    """
+
+    # return polygon closed on first boundary point
+    points = meta[ 'points' ][ 0:4 ]
+    return Polygon( points + points[ 0:1 ] )
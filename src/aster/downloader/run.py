@@ -2,7 +2,12 @@ import os
 import sys
 import argparse
 
+from datetime import datetime
+from shapely.geometry import box
+
 from downloader import Downloader
+from catalog import Catalog
+from index import SceneIndex
 
 def parseArguments(args=None):
 
@@ -10,17 +15,125 @@ def parseArguments(args=None):
     Placeholder
     """
 
+    # default to scrape command for backwards compatibility
+    if args is None:
+        args = sys.argv[ 1: ]
+
+    if len( args ) == 0 or args[ 0 ] not in [ 'scrape', 'query' ]:
+        args = [ 'scrape' ] + list( args )
+
+    # arguments common to all commands
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('start_date', action="store")
+    common.add_argument('end_date', action="store")
+
+    common.add_argument('-ts', '--start_hour', action="store")
+    common.add_argument('-te', '--end_hour', action="store")
+
+    # raw data path and granule metadata catalog
+    common.add_argument('-o', '--root_path', action="store", default='/data/raw/tau-ken/25994' )
+    common.add_argument('-c', '--catalog', action="store", default=None )
+
+    # aoi bounding boxes - ulx uly lrx lry in lon / lat
+    common.add_argument('-b', '--bbox', action="append", nargs=4, type=float, default=None )
+
     # parse command line arguments
     parser = argparse.ArgumentParser(description='aster download ard')
-    parser.add_argument('start_date', action="store")
-    parser.add_argument('end_date', action="store")
+    subparsers = parser.add_subparsers(dest='command')
 
-    parser.add_argument('-ts', '--start_hour', action="store")
-    parser.add_argument('-te', '--end_hour', action="store")
+    scrape = subparsers.add_parser('scrape', parents=[ common ], help='scrape archive and download intersecting granules')
+
+    # concurrent scraping
+    scrape.add_argument('-w', '--workers', action="store", type=int, default=1 )
+    scrape.add_argument('-u', '--url', action="store", default=None )
+    scrape.add_argument('-f', '--refresh', action="store", type=int, default=7, help='days after acquisition to keep re-listing folders' )
+
+    # http connection pool
+    scrape.add_argument('-p', '--pool_size', action="store", type=int, default=None )
+    scrape.add_argument('-r', '--retries', action="store", type=int, default=3 )
+
+    # download queue
+    scrape.add_argument('-d', '--downloads', action="store", type=int, default=1 )
+    scrape.add_argument('-l', '--limit', action="store", type=float, default=None, help='bandwidth cap in MB/s' )
+    scrape.add_argument('-k', '--chunk_size', action="store", type=int, default=1024, help='read chunk size in KiB' )
+
+    subparsers.add_parser('query', parents=[ common ], help='list catalogued granules intersecting aois without network access')
 
     return parser.parse_args(args)
 
 
+def getBoundingBoxes( args ):
+
+    """
+    Placeholder
+    """
+
+    # handcraft default bbox
+    bboxes = [ {
+                'ulx' : 73.3,
+                'uly' : 50.5,
+                'lrx' : 75.3,
+                'lry' : 48.5,
+        } ]
+
+    # replace with command line bboxes
+    if args.bbox is not None:
+        bboxes = [ { 'ulx' : b[ 0 ], 'uly' : b[ 1 ], 'lrx' : b[ 2 ], 'lry' : b[ 3 ] } for b in args.bbox ]
+
+    return bboxes
+
+
+def scrape( args, bboxes ):
+
+    """
+    Placeholder
+    """
+
+    # scrape archive for each bbox
+    obj = Downloader( root_path=args.root_path, root_url=args.url, workers=args.workers, pool_size=args.pool_size, retries=args.retries, catalog=args.catalog,
+                        downloads=args.downloads, rate=args.limit * 1e6 if args.limit is not None else None, chunk_size=args.chunk_size * 1024,
+                        refresh=args.refresh )
+    for bbox in bboxes:
+        obj.process( args, bbox )
+
+    # report connection reuse
+    stats = obj.getConnectionStats()
+    print ( 'Connections opened: {} reused: {} requests: {}'.format( stats[ 'opened' ], stats[ 'reused' ], stats[ 'requests' ] ) )
+
+    return
+
+
+def query( args, bboxes ):
+
+    """
+    Placeholder
+    """
+
+    # build spatial index over catalogued footprints
+    catalog = args.catalog
+    if catalog is None:
+        catalog = os.path.join( args.root_path, 'catalog.db' )
+
+    index = SceneIndex( Catalog( catalog ) )
+
+    start_date = datetime.strptime( args.start_date, '%d/%m/%Y' )
+    end_date = datetime.strptime( args.end_date, '%d/%m/%Y' )
+
+    # print granules matching each bbox
+    for bbox in bboxes:
+
+        aoi = box( min( bbox[ 'ulx' ], bbox[ 'lrx' ] ), min( bbox[ 'uly' ], bbox[ 'lry' ] ),
+                    max( bbox[ 'ulx' ], bbox[ 'lrx' ] ), max( bbox[ 'uly' ], bbox[ 'lry' ] ) )
+
+        granules = index.query( aoi, start_date, end_date, args.start_hour, args.end_hour )
+
+        print ( 'AoI: {} {} {} {} - {} of {} granules'.format( bbox[ 'ulx' ], bbox[ 'uly' ], bbox[ 'lrx' ], bbox[ 'lry' ], len( granules ), len( index ) ) )
+        for g in granules:
+            print ( '{} {} {:02d} {}'.format( g[ 'name' ], g[ 'folder' ], g[ 'hour' ], g[ 'state' ] or '-' ) )
+
+    return
+
+
 def main():
 
     """
@@ -29,22 +142,19 @@ def main():
 
     # parse arguments
     args = parseArguments()
-    obj = Downloader()
 
     # handcraft additional args
     args.start_hour = 5; args.end_hour = 7
-    bbox = { 
-                'ulx' : 73.3,
-                'uly' : 50.5,
-                'lrx' : 75.3,
-                'lry' : 48.5,
-        }
+    bboxes = getBoundingBoxes( args )
 
-    obj.process( args, bbox )
+    # execute command
+    if args.command == 'query':
+        query( args, bboxes )
+    else:
+        scrape( args, bboxes )
 
     return
 
 # execute main
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,196 @@
+import os
+import time
+import queue
+import threading
+
+
+class Throttle:
+
+    def __init__( self, rate=None ):
+
+        """
+        Placeholder
+        """
+
+        # global bytes per second cap shared by all workers - none is unlimited
+        self._rate = rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+        return
+
+
+    def consume( self, nbytes ):
+
+        """
+        Placeholder
+        """
+
+        # reserve transfer slot and sleep until due
+        if self._rate is not None and self._rate > 0:
+
+            with self._lock:
+                now = time.monotonic()
+                self._next = max( self._next, now ) + ( nbytes / self._rate )
+                delay = self._next - now
+
+            if delay > 0:
+                time.sleep( delay )
+
+        return
+
+
+class Progress:
+
+    def __init__( self, worker, job, interval=5.0 ):
+
+        """
+        Placeholder
+        """
+
+        # expected size and bytes already held in part file
+        self._worker = worker
+        self._name = os.path.basename( job[ 'pathname' ] )
+        self._size = job[ 'info' ][ 'size' ] if job[ 'info' ] is not None else None
+
+        part_pathname = job[ 'pathname' ] + '.part'
+        self._offset = os.path.getsize( part_pathname ) if os.path.exists( part_pathname ) else 0
+
+        self._bytes = 0
+        self._interval = interval
+        self._start = self._last = time.monotonic()
+
+        return
+
+
+    def update( self, nbytes ):
+
+        """
+        Placeholder
+        """
+
+        # report throughput and eta at interval
+        self._bytes += nbytes
+
+        now = time.monotonic()
+        if now - self._last >= self._interval:
+
+            self._last = now
+            print ( 'Worker {}: {} {}'.format( self._worker, self._name, self.getReport( now ) ) )
+
+        return
+
+
+    def getReport( self, now ):
+
+        """
+        Placeholder
+        """
+
+        # compute rate in MB/s
+        rate = self._bytes / max( now - self._start, 1e-6 ) / 1e6
+        report = '{:.1f} MB {:.2f} MB/s'.format( ( self._offset + self._bytes ) / 1e6, rate )
+
+        # compute eta from remaining bytes
+        if self._size is not None and rate > 0:
+            remaining = max( 0, self._size - self._offset - self._bytes )
+            report += ' of {:.1f} MB ETA {:.0f}s'.format( self._size / 1e6, remaining / 1e6 / rate )
+
+        return report
+
+
+class TransferQueue:
+
+    def __init__( self, downloader, workers=2, rate=None, interval=5.0 ):
+
+        """
+        Placeholder
+        """
+
+        # jobs queue and completed results
+        self._downloader = downloader
+        self._jobs = queue.Queue()
+        self._results = []
+
+        self._throttle = Throttle( rate )
+        self._interval = interval
+
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+        # start download workers
+        self._threads = [ threading.Thread( target=self.run, args=( worker, ), daemon=True ) for worker in range( max( 1, workers ) ) ]
+        for thread in self._threads:
+            thread.start()
+
+        return
+
+
+    def put( self, name, url, pathname, info=None ):
+
+        """
+        Placeholder
+        """
+
+        # enqueue granule dataset for download
+        self._jobs.put( { 'name' : name, 'url' : url, 'pathname' : pathname, 'info' : info } )
+        return
+
+
+    def run( self, worker ):
+
+        """
+        Placeholder
+        """
+
+        # process jobs until sentinel received
+        while True:
+
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            progress = Progress( worker, job, interval=self._interval )
+
+            def update( nbytes ):
+
+                # apply global bandwidth cap and record progress
+                self._throttle.consume( nbytes )
+                progress.update( nbytes )
+
+                with self._lock:
+                    self._bytes += nbytes
+
+            # download dataset - connection errors must not stop worker
+            try:
+                result = self._downloader.getDataset( job[ 'url' ], job[ 'pathname' ], info=job[ 'info' ], callback=update )
+            except Exception as e:
+                print ( 'Download Error {}: {}'.format( job[ 'url' ], e ) )
+                result = False
+
+            print ( 'Worker {}: {} {}'.format( worker, os.path.basename( job[ 'pathname' ] ), progress.getReport( time.monotonic() ) ) )
+            with self._lock:
+                self._results.append( ( job, result ) )
+
+        return
+
+
+    def join( self ):
+
+        """
+        Placeholder
+        """
+
+        # signal workers to finish once queue drained
+        for thread in self._threads:
+            self._jobs.put( None )
+
+        for thread in self._threads:
+            thread.join()
+
+        # report overall throughput
+        elapsed = max( time.monotonic() - self._start, 1e-6 )
+        print ( 'Transferred {:.1f} MB in {:.0f}s - {:.2f} MB/s'.format( self._bytes / 1e6, elapsed, self._bytes / elapsed / 1e6 ) )
+
+        return self._results
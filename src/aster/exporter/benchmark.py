@@ -0,0 +1,200 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+from osgeo import gdal
+from exporter import Exporter
+
+sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
+from fs import getFileList
+
+
+def calibrateLegacy( obj, bands, data, gain, esd, sza ):
+
+    """
+    Placeholder
+    """
+
+    # per-band gain comparison chain and float64 calibration - as per original process
+    results = []
+    for band, band_data in zip( bands, data ):
+
+        bn = obj._bands.index( band )
+        key = band.replace( 'ImageData', '' ).zfill( 2 )
+
+        if gain[ key ] == 'HGH':
+            ucc1 = obj._ucc[bn, 0]
+        elif gain[ key ] == 'NOR':
+            ucc1 = obj._ucc[bn, 1]
+        elif gain[ key ] == 'LO1' or bn < 3:
+            ucc1 = obj._ucc[bn, 2]
+        else:
+            ucc1 = obj._ucc[bn, 3]
+
+        rad = obj.dn2radiance(band_data, ucc1 )
+        rad[rad == obj.dn2radiance(0, ucc1)] = 0
+
+        ref = obj.radiance2reflectance(rad, esd, sza, obj._irradiance[bn] )
+        results.append( ( rad, np.uint16( ref * ( ( 2**16 ) - 1 ) ) ) )
+
+    return results
+
+
+def calibrateBatched( obj, bands, data, gain, esd, sza ):
+
+    """
+    Placeholder
+    """
+
+    # precomputed coefficient table and single call per group
+    ucc, irradiance = obj.getCalibrationTable( gain )
+    idx = [ obj._bands.index( band ) for band in bands ]
+
+    return obj.calibrate( data, ucc[ idx ], irradiance[ idx ], esd, sza )
+
+
+def getScene( rows, cols ):
+
+    """
+    Placeholder
+    """
+
+    # synthetic vnir 15m and swir 30m dn stacks with no data border
+    rng = np.random.default_rng( 0 )
+    scene = {   'VNIR' : rng.integers( 0, 256, size=( 3, rows, cols ), dtype=np.uint16 ),
+                'SWIR' : rng.integers( 0, 256, size=( 6, rows // 2, cols // 2 ), dtype=np.uint16 ) }
+
+    for data in scene.values():
+        data[ :, 0:data.shape[ 1 ] // 10, : ] = 0
+
+    return scene
+
+
+def benchmarkCalibration( args ):
+
+    """
+    Placeholder
+    """
+
+    # synthetic scene and gain settings
+    obj = Exporter()
+
+    scene = getScene( args.rows, args.cols )
+    bands = { 'VNIR' : obj._bands[ 0:3 ], 'SWIR' : obj._bands[ 3: ] }
+    gain = { '01' : 'HGH', '02' : 'NOR', '3N' : 'NOR', '04' : 'NOR', '05' : 'LO1', '06' : 'NOR', '07' : 'LO2', '08' : 'NOR', '09' : 'HGH' }
+    esd = 1.0; sza = 45.0
+
+    # check outputs agree
+    for group, data in scene.items():
+
+        legacy = calibrateLegacy( obj, bands[ group ], data, gain, esd, sza )
+        rad, ref = calibrateBatched( obj, bands[ group ], data, gain, esd, sza )
+
+        for i, ( l_rad, l_ref ) in enumerate( legacy ):
+            # float32 kernel may truncate one count either side of float64 path
+            if not np.allclose( l_rad, rad[ i ], rtol=1e-6 ) or np.abs( l_ref.astype( np.int32 ) - ref[ i ] ).max() > 1:
+                print ( 'Calibration mismatch: {}'.format( bands[ group ][ i ] ) )
+                return
+
+    # time per-scene calibration
+    for name, fn in [ ( 'legacy', calibrateLegacy ), ( 'batched', calibrateBatched ) ]:
+
+        start = time.perf_counter()
+        for i in range( args.repeat ):
+            for group, data in scene.items():
+                fn( obj, bands[ group ], data, gain, esd, sza )
+
+        print ( '{:<8} {:8.1f} ms/scene'.format( name, ( time.perf_counter() - start ) * 1000.0 / args.repeat ) )
+
+    return
+
+
+def benchmarkProfiles( args ):
+
+    """
+    Placeholder
+    """
+
+    # export reflectance level of scene with each creation profile
+    for profile in args.profiles:
+
+        out_path = os.path.join( args.out_path, profile )
+        obj = Exporter( products=[ 'reflectance' ], profiles={ 'reflectance' : profile }, force=True )
+
+        start = time.perf_counter()
+        obj.process( args.scene, out_path=out_path )
+        export_time = time.perf_counter() - start
+
+        files = getFileList( out_path, '*_reflectance.tif' )
+        size = sum( os.path.getsize( f ) for f in files )
+
+        # time aoi-sized warp around image centre - as per clipper
+        start = time.perf_counter()
+        for i in range( args.repeat ):
+            for f in files:
+
+                ds = gdal.Open( f )
+                geo = ds.GetGeoTransform()
+
+                cx = geo[ 0 ] + geo[ 1 ] * ds.RasterXSize / 2; cy = geo[ 3 ] + geo[ 5 ] * ds.RasterYSize / 2
+                half = args.window * geo[ 1 ] / 2
+
+                gdal.Warp( '', ds, format='MEM', outputBounds=[ cx - half, cy - half, cx + half, cy + half ] )
+                ds = None
+
+        clip_time = ( time.perf_counter() - start ) / args.repeat
+        print ( '{:<10} {:10.1f} MB {:8.2f}s export {:8.3f}s clip-read'.format( profile, size / 1e6, export_time, clip_time ) )
+
+    return
+
+
+def parseArguments(args=None):
+
+    """
+    Placeholder
+    """
+
+    # parse command line arguments
+    parser = argparse.ArgumentParser(description='aster exporter benchmark')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    # calibration kernel on synthetic scene
+    calibration = subparsers.add_parser('calibration')
+    calibration.add_argument('-r', '--rows', action="store", type=int, default=4980 )
+    calibration.add_argument('-c', '--cols', action="store", type=int, default=4200 )
+    calibration.add_argument('-n', '--repeat', action="store", type=int, default=3 )
+
+    # creation profiles on real scene
+    profiles = subparsers.add_parser('profiles')
+    profiles.add_argument('scene', action="store")
+    profiles.add_argument('out_path', action="store")
+    profiles.add_argument('-p', '--profiles', nargs='+', default=[ 'striped', 'tiled', 'deflate', 'zstd', 'overviews', 'cog' ] )
+    profiles.add_argument('-w', '--window', action="store", type=int, default=1000 )
+    profiles.add_argument('-n', '--repeat', action="store", type=int, default=3 )
+
+    return parser.parse_args(args)
+
+
+def main():
+
+    """
+    Placeholder
+    """
+
+    # parse arguments
+    args = parseArguments()
+
+    # execute benchmark
+    if args.command == 'profiles':
+        benchmarkProfiles( args )
+    else:
+        benchmarkCalibration( args )
+
+    return
+
+# execute main
+if __name__ == '__main__':
+    main()
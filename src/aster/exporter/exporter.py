@@ -1,18 +1,48 @@
 import os
 import re
+import json
+import hashlib
 import numpy as np
+from xml.sax.saxutils import escape
 from osgeo import gdal, osr
 from datetime import datetime
 
 
 class Exporter:
 
-    def __init__(self ):
+    # bump when changes alter exported output
+    version = '1.1'
+
+    def __init__(self, block_size=512, products=( 'dn', 'radiance', 'reflectance' ), radiance_vrt=False, profiles=None, force=False ):
 
         """
         Placeholder
         """
 
+        # rows per processing block
+        self._block_size = block_size
+
+        # output levels to materialise - radiance optionally as scaled vrt over dn
+        self._products = list( products )
+        self._radiance_vrt = radiance_vrt
+
+        # geotiff creation profiles - predictor chosen per datatype
+        tiled = [ 'TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256' ]
+        self._profiles = {  'striped' : { 'options' : [], 'overviews' : False, 'cog' : False },
+                            'tiled' : { 'options' : tiled, 'overviews' : False, 'cog' : False },
+                            'deflate' : { 'options' : tiled + [ 'COMPRESS=DEFLATE', 'PREDICTOR={predictor}' ], 'overviews' : False, 'cog' : False },
+                            'zstd' : { 'options' : tiled + [ 'COMPRESS=ZSTD', 'PREDICTOR={predictor}' ], 'overviews' : False, 'cog' : False },
+                            'overviews' : { 'options' : tiled + [ 'COMPRESS=DEFLATE', 'PREDICTOR={predictor}' ], 'overviews' : True, 'cog' : False },
+                            'cog' : { 'options' : tiled, 'overviews' : True, 'cog' : True } }
+
+        # profile per output level - default striped uncompressed
+        self._level_profiles = { 'dn' : 'striped', 'radiance' : 'striped', 'reflectance' : 'striped' }
+        if profiles is not None:
+            self._level_profiles.update( { k : v for k, v in profiles.items() if v is not None } )
+
+        # re-export scenes even if manifest reports unchanged
+        self._force = force
+
         # dn to reflectance / radiance coefficients
         self._ucc = np.matrix(([[0.676, 1.688, 2.25, 0.0],\
                                 [0.708, 1.415, 1.89, 0.0],\
@@ -27,27 +57,38 @@ class Exporter:
         # Thome et al. is used, which uses spectral irradiance values from MODTRAN
         # Ordered b1, b2, b3N, b4, b5...b9
         self._irradiance = [1848, 1549, 1114, 225.4, 86.63, 81.85, 74.85, 66.49, 59.85]
+
+        # subdataset band names and gain setting to ucc column
+        self._bands = [ 'ImageData1', 'ImageData2', 'ImageData3N', 'ImageData4', 'ImageData5', 'ImageData6', 'ImageData7', 'ImageData8', 'ImageData9' ]
+        self._gains = { 'HGH' : 0, 'NOR' : 1, 'LO1' : 2 }
         return
 
 
-    def process( self, scene, out_path=None ):
+    def process( self, scene, out_path=None, groups=None ):
 
         """
         Placeholder
         """
 
+        # initialise output path
+        raw_path = os.path.dirname( scene )
+        if out_path is None:
+            out_path = raw_path.replace( 'raw', 'ard' )
+
+        # postpone export if inputs and options unchanged since last export
+        manifest = self.getManifestPathname( scene, out_path, groups )
+        if not self._force and self.isUnchanged( scene, manifest, groups ):
+            print ( 'Scene unchanged - ignoring... {}'.format( scene ) )
+            return
+
         # open file
-        in_ds = gdal.Open( scene )
+        exported = []
+        in_ds = gdal.Open( os.path.abspath( scene ) )
         if in_ds is not None:
 
-            # initialise output path
-            raw_path = os.path.dirname( scene )
-            if out_path is None:
-                out_path = raw_path.replace( 'raw', 'ard' )
-
             # initialise output path
             if not os.path.exists( out_path ):
-                os.makedirs( out_path, 0o755 )
+                os.makedirs( out_path, 0o755, exist_ok=True )
 
             # extract metadata / subdatasets
             in_sds = in_ds.GetSubDatasets()
@@ -63,214 +104,370 @@ class Exporter:
             # get utm projection
             utm = self.getUtmProjection( meta )
 
-            # cycle through subdatasets
+            # get per-band calibration coefficients for scene gain settings
+            ucc, irradiance = self.getCalibrationTable( gain )
+
+            # group visible and shortwave ir subdatasets - bands within group share dimensions
+            subdatasets = { 'VNIR' : [], 'SWIR' : [] }
             for gname in in_sds:
 
                 # locate visible and shortwave ir datasets
                 vnir = re.search("(VNIR.*)", gname[ 0 ])
                 swir = re.search("(SWIR.*)", gname[ 0 ])
                 if vnir or swir:
+                    subdatasets[ 'VNIR' if vnir else 'SWIR' ].append( gname[ 0 ] )
 
-                    # create tif output name
-                    band = gname[ 0 ].split(':')[-1]
-
-                    out_pathname = '{}/{}_{}.tif'.format(out_path, os.path.basename( scene ).split('.hdf')[0], band )
-                    out_pathname_rad = '{}_radiance.tif'.format(out_pathname.split('.tif')[0])
-                    out_pathname_ref = '{}_reflectance.tif'.format(out_pathname.split('.tif')[0])
-
-                    # open SDS and create array            
-                    band_ds = gdal.Open( gname[ 0 ], gdal.GA_ReadOnly)
-                    band_data = band_ds.ReadAsArray().astype(np.uint16)
-                    
-                    # define extent and offset for UTM South zones            
-                    if utm[ 'n_s' ] < 0:
-                        ul_y = utm[ 'ul' ][0] + 10000000
-                        ul_x = utm[ 'ul' ][1]
-                    
-                        lr_y = utm[ 'lr' ][0] + 10000000
-                        lr_x = utm[ 'lr' ][1]
-                        
-                    # define extent for UTM North zones            
-                    else:
-                        ul_y = utm[ 'ul' ][0] 
-                        ul_x = utm[ 'ul' ][1]
-                    
-                        lr_y = utm[ 'lr' ][0] 
-                        lr_x = utm[ 'lr' ][1]
+            # define extent and offset for UTM South zones            
+            if utm[ 'n_s' ] < 0:
+                ul_y = utm[ 'ul' ][0] + 10000000
+                ul_x = utm[ 'ul' ][1]
+            
+                lr_y = utm[ 'lr' ][0] + 10000000
+                lr_x = utm[ 'lr' ][1]
                 
-                    # query raster dimensions and calculate raster x & y resolution
-                    ncols, nrows = band_data.shape            
-                    y_res = -1 * round((max( ul_y, lr_y ) - min( ul_y, lr_y ) ) / ncols )
-                    x_res = round((max( ul_x, lr_x ) - min( ul_x, lr_x ) ) / nrows )
+            # define extent for UTM North zones            
+            else:
+                ul_y = utm[ 'ul' ][0] 
+                ul_x = utm[ 'ul' ][1]
+            
+                lr_y = utm[ 'lr' ][0] 
+                lr_x = utm[ 'lr' ][1]
+
+            # define CRS
+            srs = osr.SpatialReference()
+            srs.ImportFromEPSG(utm[ 'zone' ] )
+
+            # cycle through subdataset groups - optionally restricted to subset
+            for group, sds in subdatasets.items():
+                if len( sds ) > 0 and ( groups is None or group in groups ):
+
+                    # create tif output names
+                    bands = [ name.split(':')[-1] for name in sds ]
+                    idx = [ self._bands.index( band ) for band in bands ]
+
+                    out_pathnames = [ '{}/{}_{}.tif'.format(out_path, os.path.basename( scene ).split('.hdf')[0], band ) for band in bands ]
+
+                    # open SDS - bands within group share dimensions
+                    band_ds = [ gdal.Open( name, gdal.GA_ReadOnly) for name in sds ]
+                    xsize, ysize = band_ds[ 0 ].RasterXSize, band_ds[ 0 ].RasterYSize
+                
+                    # calculate raster x & y resolution
+                    y_res = -1 * round((max( ul_y, lr_y ) - min( ul_y, lr_y ) ) / ysize )
+                    x_res = round((max( ul_x, lr_x ) - min( ul_x, lr_x ) ) / xsize )
 
                     # define UL x and y coordinates based on spatial resolution
                     ul_yy = ul_y - (y_res/2)
                     ul_xx = ul_x - (x_res/2)
+                    geo = (ul_xx, x_res, 0., ul_yy, 0., y_res)
 
-                    #------------------------------------------------------------------------------
-
-                    # start conversions by band (1-9)        
-                    if band == 'ImageData1':
-                        bn = -1 + 1                
-                        # query for gain specified in file metadata (by band)            
-                        if gain['01'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['01'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        else:
-                            ucc1 = self._ucc[bn, 2] 
-                        
-                    if band == 'ImageData2':
-                        bn = -1 + 2
-                        # query for gain specified in file metadata (by band)            
-                        if gain['02'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['02'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        else:
-                            ucc1 = self._ucc[bn, 2] 
-                        
-                    if band == 'ImageData3N':
-                        bn = -1 + 3                
-                        # Query for gain specified in file metadata (by band)            
-                        if gain['3N'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['3N'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        else:
-                            ucc1 = self._ucc[bn, 2] 
-                        
-                    if band == 'ImageData4':
-                        bn = -1 + 4                
-                        # Query for gain specified in file metadata (by band)            
-                        if gain['04'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['04'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        elif gain['04'] == 'LO1':
-                            ucc1 = self._ucc[bn, 2] 
-                        else:
-                            ucc1 = self._ucc[bn, 3] 
-                        
-                    if band == 'ImageData5':
-                        bn = -1 + 5                
-                        # Query for gain specified in file metadata (by band)            
-                        if gain['05'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['05'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        elif gain['05'] == 'LO1':
-                            ucc1 = self._ucc[bn, 2] 
-                        else:
-                            ucc1 = self._ucc[bn, 3] 
-                        
-                    if band == 'ImageData6':
-                        bn = -1 + 6                
-                        # Query for gain specified in file metadata (by band)            
-                        if gain['06'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['06'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        elif gain['06'] == 'LO1':
-                            ucc1 = self._ucc[bn, 2] 
-                        else:
-                            ucc1 = self._ucc[bn, 3] 
-                            
-                    if band == 'ImageData7':
-                        bn = -1 + 7                
-                        # Query for gain specified in file metadata (by band)            
-                        if gain['07'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['07'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        elif gain['07'] == 'LO1':
-                            ucc1 = self._ucc[bn, 2] 
-                        else:
-                            ucc1 = self._ucc[bn, 3] 
-                        
-                    if band == 'ImageData8':
-                        bn = -1 + 8                
-                        # Query for gain specified in file metadata (by band)            
-                        if gain['08'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['08'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        elif gain['08'] == 'LO1':
-                            ucc1 = self._ucc[bn, 2] 
-                        else:
-                            ucc1 = self._ucc[bn, 3] 
-                            
-                    if band == 'ImageData9':
-                        bn = -1 + 9                
-                        # Query for gain specified in file metadata (by band)            
-                        if gain['09'] == 'HGH':
-                            ucc1 = self._ucc[bn, 0] 
-                        elif gain['09'] == 'NOR':
-                            ucc1 = self._ucc[bn, 1] 
-                        elif gain['09'] == 'LO1':
-                            ucc1 = self._ucc[bn, 2] 
-                        else:
-                            ucc1 = self._ucc[bn, 3] 
-
-                    #------------------------------------------------------------------------------
-                
-                    # generate radiance geotiff files
-                    driver = gdal.GetDriverByName('GTiff')
-                    dn = driver.Create(out_pathname, nrows, ncols, 1, gdal.GDT_UInt16)
-                    
-                    # define CRS and extent properties
-                    srs = osr.SpatialReference()
-                    srs.ImportFromEPSG(utm[ 'zone' ] )
-                    dn.SetProjection(srs.ExportToWkt())
-                    dn.SetGeoTransform((ul_xx, x_res, 0., ul_yy, 0., y_res))
-                    
-                    # write SDS array to geoTiff
-                    outband = dn.GetRasterBand(1)
-                    outband.SetNoDataValue(0)
-                    outband.WriteArray(band_data)
-                    dn = None
-
-                    #------------------------------------------------------------------------------
-
-                    # convert dn to radiance        
-                    rad = self.dn2radiance(band_data, ucc1 )
-                    rad[rad == self.dn2radiance(0, ucc1)] = 0
-                    del band_data
-
-                    # Next, Radiance (w/m2/sr/µm)
-                    out_rad = driver.Create(out_pathname_rad, nrows, ncols, 1, gdal.GDT_Float32)
-                    
-                    # Define output GeoTiff CRS and extent properties
-                    out_rad.SetProjection(srs.ExportToWkt())
-                    out_rad.SetGeoTransform((ul_xx, x_res, 0., ul_yy, 0., y_res))
-                
-                    # Write SDS array to output GeoTiff
-                    outband = out_rad.GetRasterBand(1)
-                    outband.SetNoDataValue(0)
-                    outband.WriteArray(rad)
-                    out_rad = None
-
-                    #------------------------------------------------------------------------------
-
-                    # Convert radiance to TOA reflectance
-                    irradiance = self._irradiance[bn]
-                    ref = self.radiance2reflectance(rad, esd, sza, irradiance )
-                    del rad
-
-                    # reflectance (w/m2/sr/µm)
-                    ref = np.uint16( ref * ( ( 2**16 ) - 1 ) )
-                    print ( 'Exporting: {}'.format( out_pathname ) )
-                    out_ref = driver.Create(out_pathname_ref, nrows, ncols, 1, gdal.GDT_UInt16)
-                
-                    # Define output GeoTiff CRS and extent properties
-                    out_ref.SetProjection(srs.ExportToWkt())
-                    out_ref.SetGeoTransform((ul_xx, x_res, 0., ul_yy, 0., y_res))
-                    
-                    # Write SDS array to output GeoTiff
-                    outband = out_ref.GetRasterBand(1)
-                    outband.SetNoDataValue(0)
-                    outband.WriteArray(ref)
-                    out_ref = None
+                    # create requested dn, radiance (w/m2/sr/µm) and reflectance geotiffs
+                    levels = [ ( 'dn', '{}.tif', gdal.GDT_UInt16 ), ( 'radiance', '{}_radiance.tif', gdal.GDT_Float32 ), ( 'reflectance', '{}_reflectance.tif', gdal.GDT_UInt16 ) ]
+
+                    outputs = { 'dn' : [], 'radiance' : [], 'reflectance' : [] }
+                    created = []
+                    for out_pathname in out_pathnames:
+
+                        print ( 'Exporting: {}'.format( out_pathname ) )
+                        for level, template, datatype in levels:
+
+                            if level in self._products and not ( level == 'radiance' and self._radiance_vrt ):
+
+                                pathname = template.format( out_pathname.split('.tif')[0] )
+                                outputs[ level ].append( self.createImage( pathname, xsize, ysize, datatype, srs, geo, profile=self._level_profiles[ level ] ) )
+                                created.append( ( pathname, self._level_profiles[ level ] ) )
+
+                    # preallocate block buffers aligned to output tiles - memory bounded by block size not scene size
+                    tile = 256 if any( self._profiles[ profile ][ 'options' ] for pathname, profile in created ) else 1
+                    block = min( max( tile, ( self._block_size // tile ) * tile ), ysize )
+
+                    band_data = np.empty( ( len( band_ds ), block, xsize ), dtype=np.uint16 )
+                    rad = np.empty( band_data.shape, dtype=np.float32 )
+                    ref = np.empty( band_data.shape, dtype=np.uint16 )
+
+                    # stream row strips through calibration - skipped when only dn is materialised
+                    calibrate = len( outputs[ 'radiance' ] ) > 0 or len( outputs[ 'reflectance' ] ) > 0
+                    if calibrate or len( outputs[ 'dn' ] ) > 0:
+
+                        for y in range( 0, ysize, block ):
+
+                            rows = min( block, ysize - y )
+                            for i, ds in enumerate( band_ds ):
+                                ds.GetRasterBand( 1 ).ReadAsArray( 0, y, xsize, rows, buf_obj=band_data[ i, :rows ] )
+
+                            # calibrate all bands in group as single batched operation
+                            if calibrate:
+                                self.calibrate( band_data[ :, :rows ], ucc[ idx ], irradiance[ idx ], esd, sza, rad=rad[ :, :rows ], ref=ref[ :, :rows ] )
+
+                            for name, data in [ ( 'dn', band_data ), ( 'radiance', rad ), ( 'reflectance', ref ) ]:
+                                for i, out_ds in enumerate( outputs[ name ] ):
+                                    out_ds.GetRasterBand( 1 ).WriteArray( data[ i, :rows ], 0, y )
+
+                    # close datasets
+                    band_ds = outputs = None
+                    del band_data, rad, ref
+
+                    # build overviews and cloud-optimised layout where profile requires
+                    for pathname, profile in created:
+                        self.finaliseImage( pathname, profile )
+                        exported.append( pathname )
+
+                    # radiance as virtual raster applying ucc scale and offset to dn geotiff or subdataset
+                    if 'radiance' in self._products and self._radiance_vrt:
+                        for i, ( name, out_pathname ) in enumerate( zip( sds, out_pathnames ) ):
+
+                            # dn geotiff alongside vrt - else subdataset of absolute scene path
+                            if 'dn' in self._products:
+                                source = os.path.basename( out_pathname ); relative = True
+                            else:
+                                source = name; relative = False
+
+                            self.writeRadianceVrt( '{}_radiance.vrt'.format(out_pathname.split('.tif')[0]), source, xsize, ysize, ucc[ idx[ i ] ], srs, geo, relative=relative )
+                            exported.append( '{}_radiance.vrt'.format(out_pathname.split('.tif')[0]) )
+
+            # record inputs, options and outputs of completed export
+            self.writeManifest( scene, manifest, groups, exported )
+
+        return
+
+
+    def getManifestPathname( self, scene, out_path, groups ):
+
+        """
+        Placeholder
+        """
+
+        # one manifest per scene - or per subdataset group subset
+        name = os.path.basename( scene ).split('.hdf')[0]
+        if groups is not None:
+            name = '{}_{}'.format( name, '_'.join( sorted( groups ) ) )
+
+        return os.path.join( out_path, name + '.manifest.json' )
+
+
+    def getOptions( self, groups ):
+
+        """
+        Placeholder
+        """
+
+        # options affecting exported output
+        return {    'products' : sorted( self._products ),
+                    'radiance_vrt' : self._radiance_vrt,
+                    'profiles' : { level : self._level_profiles[ level ] for level in self._products },
+                    'groups' : sorted( groups ) if groups is not None else None }
+
+
+    def getFileHash( self, pathname ):
+
+        """
+        Placeholder
+        """
+
+        # sha256 digest in 1MB chunks
+        digest = hashlib.sha256()
+        with open( pathname, 'rb' ) as f:
+            for block in iter( lambda: f.read( 1024 * 1024 ), b'' ):
+                digest.update( block )
+
+        return digest.hexdigest()
+
+
+    def isUnchanged( self, scene, manifest, groups ):
+
+        """
+        Placeholder
+        """
+
+        # no record of previous export
+        if not os.path.exists( manifest ) or not os.path.exists( scene ):
+            return False
+
+        with open( manifest, 'r' ) as f:
+            record = json.load( f )
+
+        # exporter version or options changed
+        if record.get( 'version' ) != self.version or record.get( 'options' ) != self.getOptions( groups ):
+            return False
+
+        # outputs removed since export - empty list valid where group yields no subdatasets
+        if 'outputs' not in record or not all( os.path.exists( pathname ) for pathname in record[ 'outputs' ] ):
+            return False
+
+        # input size changed
+        stat = os.stat( scene )
+        if record[ 'input' ][ 'size' ] != stat.st_size:
+            return False
+
+        # input touched - only hash when modification time differs
+        if record[ 'input' ][ 'mtime' ] != stat.st_mtime:
+            if record[ 'input' ][ 'sha256' ] != self.getFileHash( scene ):
+                return False
+
+            # content unchanged - refresh recorded mtime
+            record[ 'input' ][ 'mtime' ] = stat.st_mtime
+            with open( manifest, 'w' ) as f:
+                json.dump( record, f, indent=2 )
+
+        return True
+
+
+    def writeManifest( self, scene, manifest, groups, outputs ):
+
+        """
+        Placeholder
+        """
+
+        # record input fingerprint, version, options and outputs
+        stat = os.stat( scene )
+        record = {  'version' : self.version,
+                    'input' : { 'pathname' : scene, 'size' : stat.st_size, 'mtime' : stat.st_mtime, 'sha256' : self.getFileHash( scene ) },
+                    'options' : self.getOptions( groups ),
+                    'outputs' : outputs }
+
+        with open( manifest, 'w' ) as f:
+            json.dump( record, f, indent=2 )
+
+        return
+
+
+    def getCalibrationTable( self, gain ):
+
+        """
+        Placeholder
+        """
+
+        # gain setting to ucc column - unmatched vnir gain is low, unmatched swir gain is low 2
+        cols = []
+        for i, band in enumerate( self._bands ):
+
+            key = band.replace( 'ImageData', '' ).zfill( 2 )
+            cols.append( self._gains.get( gain.get( key ), 2 if i < 3 else 3 ) )
+
+        # unit conversion coefficient and irradiance per band
+        ucc = np.asarray( self._ucc )[ np.arange( len( self._bands ) ), cols ]
+        return ucc, np.asarray( self._irradiance )
+
+
+    def calibrate( self, dn, ucc, irradiance, esd, sza, rad=None, ref=None ):
+
+        """
+        Placeholder
+        """
+
+        # allocate float32 radiance and uint16 reflectance outputs unless supplied
+        if rad is None:
+            rad = np.empty( dn.shape, dtype=np.float32 )
+
+        if ref is None:
+            ref = np.empty( dn.shape, dtype=np.uint16 )
+
+        # broadcast per-band coefficients over stacked band axis
+        ucc = np.asarray( ucc, dtype=np.float32 ).reshape( -1, 1, 1 )
+        irradiance = np.asarray( irradiance, dtype=np.float64 ).reshape( -1, 1, 1 )
+
+        # fold radiance to uint16 scaled TOA reflectance into one coefficient per band
+        scale = ( self.radiance2reflectance( 1.0, esd, sza, irradiance ) * ( ( 2**16 ) - 1 ) ).astype( np.float32 )
+
+        # convert dn to radiance in place - zero dn is no data
+        np.subtract( dn, 1, out=rad, dtype=np.float32 )
+        np.multiply( rad, ucc, out=rad )
+        np.copyto( rad, 0, where=( dn == 0 ) )
+
+        # scale radiance straight into reflectance buffer - truncating cast as per np.uint16
+        np.multiply( rad, scale, out=ref, casting='unsafe' )
+
+        return rad, ref
+
+
+    def createImage( self, pathname, xsize, ysize, datatype, srs, geo, profile='striped' ):
+
+        """
+        Placeholder
+        """
+
+        # get creation options - predictor 3 for floating point else 2
+        settings = self._profiles[ profile ]
+        predictor = '3' if datatype == gdal.GDT_Float32 else '2'
+        options = [ option.replace( '{predictor}', predictor ) for option in settings[ 'options' ] ]
+
+        # cog layout written by copy from intermediate tiled geotiff
+        if settings[ 'cog' ]:
+            pathname = self.getIntermediatePathname( pathname )
+
+        # create geotiff 
+        driver = gdal.GetDriverByName('GTiff')
+        ds = driver.Create(pathname, xsize, ysize, 1, datatype, options)
+        
+        # define CRS and extent properties
+        ds.SetProjection(srs.ExportToWkt())
+        ds.SetGeoTransform(geo)
+        ds.GetRasterBand(1).SetNoDataValue(0)
+
+        return ds
+
+
+    def finaliseImage( self, pathname, profile ):
+
+        """
+        Placeholder
+        """
+
+        settings = self._profiles[ profile ]
+        if settings[ 'cog' ]:
+
+            # copy intermediate into cloud optimised geotiff with internal overviews
+            intermediate = self.getIntermediatePathname( pathname )
+            gdal.Translate( pathname, intermediate, format='COG', creationOptions=[ 'COMPRESS=DEFLATE', 'PREDICTOR=YES', 'BLOCKSIZE=512', 'OVERVIEW_RESAMPLING=AVERAGE' ] )
+            os.remove( intermediate )
+
+        elif settings[ 'overviews' ]:
+
+            # build internal overviews - average respects no data
+            ds = gdal.Open( pathname, gdal.GA_Update )
+            ds.BuildOverviews( 'AVERAGE', [ 2, 4, 8, 16 ] )
+            ds = None
+
+        return
+
+
+    def getIntermediatePathname( self, pathname ):
+
+        """
+        Placeholder
+        """
+
+        # intermediate name not matched by downstream *_reflectance.tif patterns
+        return os.path.splitext( pathname )[ 0 ] + '.tmp.tif'
+
+
+    def writeRadianceVrt( self, pathname, source, xsize, ysize, ucc1, srs, geo, relative=False ):
+
+        """
+        Placeholder
+        """
+
+        # radiance = ( dn - 1 ) * ucc - zero dn left as no data
+        xml = """<VRTDataset rasterXSize="{xsize}" rasterYSize="{ysize}">
+  <SRS>{srs}</SRS>
+  <GeoTransform>{geo}</GeoTransform>
+  <VRTRasterBand dataType="Float32" band="1">
+    <NoDataValue>0</NoDataValue>
+    <ComplexSource>
+      <SourceFilename relativeToVRT="{relative}">{source}</SourceFilename>
+      <SourceBand>1</SourceBand>
+      <SrcRect xOff="0" yOff="0" xSize="{xsize}" ySize="{ysize}"/>
+      <DstRect xOff="0" yOff="0" xSize="{xsize}" ySize="{ysize}"/>
+      <NODATA>0</NODATA>
+      <ScaleOffset>{offset!r}</ScaleOffset>
+      <ScaleRatio>{ratio!r}</ScaleRatio>
+    </ComplexSource>
+  </VRTRasterBand>
+</VRTDataset>
+""".format( xsize=xsize, ysize=ysize, srs=escape( srs.ExportToWkt() ), geo=', '.join( repr( float( v ) ) for v in geo ),
+                source=escape( source ), relative=1 if relative else 0, offset=-float( ucc1 ), ratio=float( ucc1 ) )
+
+        with open( pathname, 'w' ) as f:
+            f.write( xml )
 
         return
 
@@ -1,7 +1,10 @@
 import os
 import sys
+import time
 import argparse
 
+from osgeo import gdal
+from concurrent.futures import ProcessPoolExecutor
 from exporter import Exporter
 
 sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
@@ -22,6 +25,49 @@ def getSceneList(args):
     return scenes
 
 
+def getTaskList( scenes, split ):
+
+    """
+    Placeholder
+    """
+
+    # one task per scene - else one per subdataset group
+    if split is True:
+        return [ ( scene, [ group ] ) for scene in scenes for group in [ 'VNIR', 'SWIR' ] ]
+
+    return [ ( scene, None ) for scene in scenes ]
+
+
+# exporter instance owned by pool worker
+exporter = None
+
+def initialiseWorker( cache, kwargs ):
+
+    """
+    Placeholder
+    """
+
+    # budget gdal block cache so total across workers stays within ceiling
+    global exporter
+    gdal.SetCacheMax( cache * 1024 * 1024 )
+    exporter = Exporter( **kwargs )
+
+    return
+
+
+def exportTask( task ):
+
+    """
+    Placeholder
+    """
+
+    # export hdf sub-datasets to geotiff and record wall time
+    start = time.time()
+    exporter.process( task[ 0 ], groups=task[ 1 ] )
+
+    return task[ 0 ], time.time() - start
+
+
 def parseArguments(args=None):
 
     """
@@ -38,6 +84,52 @@ def parseArguments(args=None):
                         help='batch',
                         dest='batch', action='store_true' )
 
+    # rows per processing block
+    parser.add_argument('--block_size',
+                        help='rows per processing block',
+                        type=int, default=512 )
+
+    # output levels
+    parser.add_argument('--products',
+                        help='output levels to materialise',
+                        nargs='+', choices=[ 'dn', 'radiance', 'reflectance' ], default=[ 'dn', 'radiance', 'reflectance' ] )
+
+    parser.set_defaults(radiance_vrt=False)
+    parser.add_argument('--radiance_vrt',
+                        help='write radiance as scaled vrt over dn',
+                        dest='radiance_vrt', action='store_true' )
+
+    # geotiff creation profiles - per level overrides default
+    profiles = [ 'striped', 'tiled', 'deflate', 'zstd', 'overviews', 'cog' ]
+    parser.add_argument('--profile',
+                        help='geotiff creation profile for all levels',
+                        choices=profiles, default='striped' )
+
+    for level in [ 'dn', 'radiance', 'reflectance' ]:
+        parser.add_argument('--{}_profile'.format( level ),
+                            help='geotiff creation profile for {} level'.format( level ),
+                            choices=profiles, default=None )
+
+    # ignore export manifests
+    parser.set_defaults(force=False)
+    parser.add_argument('--force',
+                        help='re-export scenes even if inputs and options unchanged',
+                        dest='force', action='store_true' )
+
+    # scene parallelism
+    parser.add_argument('--workers',
+                        help='number of export processes',
+                        type=int, default=1 )
+
+    parser.add_argument('--memory',
+                        help='total gdal cache ceiling across workers in MB',
+                        type=int, default=2048 )
+
+    parser.set_defaults(split=False)
+    parser.add_argument('--split',
+                        help='export vnir and swir subdatasets of a scene as separate tasks',
+                        dest='split', action='store_true' )
+
     return parser.parse_args(args)
 
 
@@ -49,14 +141,40 @@ def main():
 
     # parse arguments
     args = parseArguments()
-    obj = Exporter()
+    kwargs = { 'block_size' : args.block_size, 'products' : args.products, 'radiance_vrt' : args.radiance_vrt, 'force' : args.force,
+                'profiles' : {  'dn' : args.dn_profile or args.profile,
+                                'radiance' : args.radiance_profile or args.profile,
+                                'reflectance' : args.reflectance_profile or args.profile } }
 
     # for each scene
     scenes = getSceneList( args )
+    tasks = getTaskList( scenes, args.split )
+
+    start = time.time()
+    workers = max( 1, min( args.workers, len( tasks ) ) )
+    cache = max( 1, args.memory // workers )
+
+    if workers > 1:
+
+        # export tasks in process pool
+        with ProcessPoolExecutor( max_workers=workers, initializer=initialiseWorker, initargs=( cache, kwargs ) ) as pool:
+            results = list( pool.map( exportTask, tasks ) )
+
+    else:
+
+        # export tasks in this process
+        initialiseWorker( cache, kwargs )
+        results = [ exportTask( task ) for task in tasks ]
+
+    # summarise wall time per scene
+    times = {}
+    for scene, elapsed in results:
+        times[ scene ] = times.get( scene, 0.0 ) + elapsed
+
     for scene in scenes:
+        print ( '{:8.1f}s {}'.format( times.get( scene, 0.0 ), scene ) )
 
-        # export hdf sub-datasets to geotiff
-        obj.process( scene )
+    print ( 'Exported {} scenes in {:.1f}s with {} workers'.format( len( scenes ), time.time() - start, workers ) )
 
     return
 
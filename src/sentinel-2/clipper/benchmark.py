@@ -0,0 +1,266 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+from osgeo import gdal, osr
+from clipper import Clipper
+
+sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
+from aoi import AoiCatalog
+
+
+# exported band names and resolutions
+bands = [ ( 'B02', 10 ), ( 'B03', 10 ), ( 'B04', 10 ), ( 'B08', 10 ),
+            ( 'B05', 20 ), ( 'B06', 20 ), ( 'B07', 20 ), ( 'B11', 20 ), ( 'B12', 20 ),
+            ( 'B01', 60 ), ( 'B09', 60 ) ]
+
+
+def getScene( scene_path, size ):
+
+    """
+    Placeholder
+    """
+
+    # synthetic utm 43n granule covering shokpar and gargarinskoye
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG( 32643 )
+
+    for name, res in bands:
+
+        # gradient compresses well - keeps synthetic granule small on disk
+        n = size * 10 // res
+        y, x = np.indices( ( n, n ), dtype=np.uint16 )
+        data = ( y + x ) % 10000 + 1
+
+        pathname = os.path.join( scene_path, 'T43TGK_20200812T055641_{}_{}m.tif'.format( name, res ) )
+        ds = gdal.GetDriverByName( 'GTiff' ).Create( pathname, data.shape[ 1 ], data.shape[ 0 ], 1, gdal.GDT_UInt16,
+                                                    options=[ 'TILED=YES', 'COMPRESS=DEFLATE', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256' ] )
+
+        ds.SetGeoTransform( ( 399960.0, float( res ), 0.0, 4850040.0, 0.0, -float( res ) ) )
+        ds.SetProjection( srs.ExportToWkt() )
+        ds.GetRasterBand( 1 ).SetNoDataValue( 0 )
+        ds.GetRasterBand( 1 ).WriteArray( data )
+        ds = None
+
+    return scene_path
+
+
+def getContextLegacy( obj, scene_path, aois, distance ):
+
+    """
+    Placeholder
+    """
+
+    # extent, transforms and aoi windows rebuilt for every band - as per original process
+    for f in sorted( os.listdir( scene_path ) ):
+
+        if not f.endswith( '.tif' ):
+            continue
+
+        ds = gdal.Open( os.path.join( scene_path, f ) )
+        extent = obj.getExtent( ds )
+
+        image = osr.SpatialReference( wkt=ds.GetProjection() )
+        aoi_srs = osr.SpatialReference(); aoi_srs.ImportFromEPSG( 4326 )
+        local = osr.SpatialReference(); local.ImportFromEPSG( obj._epsg )
+
+        coord_tx = { 'aoi_image' : osr.CoordinateTransformation( aoi_srs, image ),
+                        'aoi_local' : osr.CoordinateTransformation( aoi_srs, local ) }
+
+        for aoi in aois:
+            bbox = obj.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_image' ], distance=distance )
+            if obj.overlapsScene( extent, bbox ) is True:
+                obj.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_local' ], distance=distance )
+
+        ds = None
+
+    return
+
+
+def getContextShared( obj, scene_path, aois, distance ):
+
+    """
+    Placeholder
+    """
+
+    # per-scene context reused across bands
+    obj._transforms = {}; obj._contexts = {}
+    for f in sorted( os.listdir( scene_path ) ):
+
+        if not f.endswith( '.tif' ):
+            continue
+
+        ds = gdal.Open( os.path.join( scene_path, f ) )
+        obj.getSceneContext( ds, aois, distance=distance )
+        ds = None
+
+    return
+
+
+def verifyResample( scene_path, aois, distance, tolerance ):
+
+    """
+    Placeholder
+    """
+
+    # compare 10m image derived from clipped 20m aoi against second warp of full scene
+    result = True
+    for native in [ False, True ]:
+
+        obj = Clipper( native=native )
+        for f in sorted( os.listdir( scene_path ) ):
+
+            if not f.endswith( '_20m.tif' ):
+                continue
+
+            ds = gdal.Open( os.path.join( scene_path, f ) )
+            for window in obj.getSceneContext( ds, aois, distance=distance )[ 'windows' ]:
+
+                if window[ 'overlaps' ] is not True:
+                    continue
+
+                # legacy path - warp full scene onto 10m grid
+                target = obj.getTarget( ds, window, 20 )
+                bbox = target[ 'bbox' ]
+                legacy = gdal.Warp( '', ds, format='MEM', dstSRS=target[ 'srs' ], xRes=10, yRes=10, 
+                                    outputBounds=[ bbox[ 'ulx'], bbox[ 'lry' ], bbox[ 'lrx' ], bbox[ 'uly'] ] ).ReadAsArray()
+
+                # derived path - upsampled clipped 20m image or warp of source window around aoi
+                obj.clipImage( ds, '/vsimem/clip_20m.tif', target )
+                derived = gdal.Open( obj.resampleImage( ds, '/vsimem/clip_20m.tif', '/vsimem/clip_10m.tif', target, 10 ) ).ReadAsArray()
+
+                gdal.Unlink( '/vsimem/clip_20m.tif' ); gdal.Unlink( '/vsimem/clip_10m.tif' )
+
+                # fraction of differing pixels within tolerance
+                if legacy.shape != derived.shape:
+                    print ( 'Shape mismatch: {} {} {} {}'.format( f, window[ 'aoi' ][ 'name' ], legacy.shape, derived.shape ) )
+                    result = False
+                    continue
+
+                diff = np.count_nonzero( legacy != derived ) / legacy.size
+                status = 'OK' if diff <= tolerance else 'FAIL'
+                result = result and diff <= tolerance
+
+                print ( '{:<6} {:<8} {:<15} {:8.4f}% differ {}'.format( 'native' if native else 'local', f.split( '_' )[ 2 ], window[ 'aoi' ][ 'name' ], diff * 100.0, status ) )
+
+            ds = None
+
+    return result
+
+
+def clearOutput( scene_path, aois ):
+
+    """
+    Placeholder
+    """
+
+    # remove aoi sub-folders between runs
+    for aoi in aois:
+        shutil.rmtree( os.path.join( scene_path, aoi[ 'name' ] ), ignore_errors=True )
+
+    return
+
+
+def parseArguments(args=None):
+
+    """
+    Placeholder
+    """
+
+    # parse command line arguments
+    parser = argparse.ArgumentParser(description='sentinel-2 clipper benchmark')
+    parser.add_argument('-s', '--size', action="store", type=int, default=10980, help='10m band size in pixels' )
+    parser.add_argument('-d', '--distance', action="store", type=int, default=10000 )
+    parser.add_argument('-n', '--repeat', action="store", type=int, default=3 )
+    parser.add_argument('-o', '--out_path', action="store", default=None )
+    parser.add_argument('-a', '--aois', action="store", default=os.path.join( os.path.dirname( sys.path[0]), '../utility/aois.geojson' ) )
+
+    # regression check of derived 10m images
+    parser.set_defaults(verify=False)
+    parser.add_argument('--verify', dest='verify', action='store_true' )
+    parser.add_argument('-t', '--tolerance', action="store", type=float, default=0.0, help='max fraction of differing pixels' )
+
+    return parser.parse_args(args)
+
+
+def main():
+
+    """
+    Placeholder
+    """
+
+    # parse arguments
+    args = parseArguments()
+    gdal.UseExceptions()
+
+    scene_path = args.out_path if args.out_path is not None else tempfile.mkdtemp()
+    if not os.path.exists( scene_path ):
+        os.makedirs( scene_path, 0o755 )
+
+    getScene( scene_path, args.size )
+    aois = AoiCatalog( args.aois )
+
+    # verify derived 10m images against legacy warp
+    if args.verify:
+
+        result = verifyResample( scene_path, aois, args.distance, args.tolerance )
+        print ( 'Derived 10m images: {}'.format( 'OK' if result else 'FAIL' ) )
+
+        if args.out_path is None:
+            shutil.rmtree( scene_path )
+
+        return
+
+    print ( 'Scene: {} AoIs x {} bands'.format( len( aois ), len( bands ) ) )
+
+    # time context setup alone - 4 aois x 11 bands
+    obj = Clipper()
+    for name, fn in [ ( 'legacy', getContextLegacy ), ( 'shared', getContextShared ) ]:
+
+        start = time.perf_counter()
+        for i in range( args.repeat ):
+            fn( obj, scene_path, aois, args.distance )
+
+        print ( '{:<8} {:8.2f} ms/scene context'.format( name, ( time.perf_counter() - start ) * 1000.0 / args.repeat ) )
+
+    # check window read matches warp onto same native grid
+    obj = Clipper( native=True )
+    ds = gdal.Open( os.path.join( scene_path, 'T43TGK_20200812T055641_B02_10m.tif' ) )
+    target = obj.getTarget( ds, obj.getSceneContext( ds, aois, distance=args.distance )[ 'windows' ][ 0 ], 10 )
+
+    window = gdal.Translate( '', ds, format='MEM', srcWin=target[ 'srcwin' ] ).ReadAsArray()
+    bbox = target[ 'bbox' ]
+    warp = gdal.Warp( '', ds, format='MEM', dstSRS=target[ 'srs' ], xRes=10, yRes=10, 
+                        outputBounds=[ bbox[ 'ulx'], bbox[ 'lry' ], bbox[ 'lrx' ], bbox[ 'uly'] ] ).ReadAsArray()
+    ds = None
+
+    if not np.array_equal( window, warp ):
+        print ( 'Window read mismatch against native warp' )
+
+    # time full clip per scene - per-band warp, native window read and single warp of band stacks
+    modes = [   ( 'warp', {} ), 
+                ( 'window', { 'native' : True } ), 
+                ( 'stack', { 'stack' : True, 'split' : True } ) ]
+
+    for name, kwargs in modes:
+
+        start = time.perf_counter()
+        for i in range( args.repeat ):
+
+            clearOutput( scene_path, aois )
+            Clipper( **kwargs ).process( scene_path, aois, distance=args.distance )
+
+        print ( '{:<8} {:8.2f} s/scene clip'.format( name, ( time.perf_counter() - start ) / args.repeat ) )
+
+    if args.out_path is None:
+        shutil.rmtree( scene_path )
+
+    return
+
+# execute main
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,18 @@
 import os
 import re
 import sys
-import osr
 
-from osgeo import gdal, ogr
-from shapely.geometry.polygon import Polygon
+from osgeo import gdal
 
 # utility functions
 sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
 from fs import getFileList, getFile
+from grid import AoiGrid
 
 
-class Clipper:
+class Clipper( AoiGrid ):
 
-    def __init__( self ):
+    def __init__( self, native=False, stack=False, split=False, resampling='near', cutline=False ):
 
         """
         Placeholder
@@ -23,7 +22,15 @@ class Clipper:
         os.environ['GDAL_CACHEMAX'] = '2048'
         gdal.UseExceptions()
 
-        self._epsg = 28412
+        # aoi windows locked to 20m grid - optionally clipped in source crs and masked by aoi polygon
+        super().__init__( 20, native=native, cutline=cutline )
+
+        # optionally warp all bands of resolution once per aoi - split back into band files
+        self._stack = stack
+        self._split = split
+
+        # 10m resample of clipped 20m aoi image
+        self._resampling = resampling
 
         return
 
@@ -36,154 +43,166 @@ class Clipper:
 
         aoi_paths = []
 
-        # get exported geotiff list
-        files = getFileList( scene_path, '*_B*_*m.tif' )
-        for f in files: 
+        # clip each band / aoi task in turn
+        for task in self.getTasks( scene_path, aois, distance=distance ):
 
-            # open image
-            ds = gdal.Open( f )
-            if ds is not None:
+            self.clip( task )
+            aoi_paths.append ( task[ 'aoi_path' ] )
+
+        return list( set( aoi_paths ) )
 
-                # get aoi to image transform
-                extent = self.getExtent ( ds )
-                coord_tx = self.getCoordinateTransform( ds )
 
-                # for each aoi
-                for aoi in aois:
+    def getTasks( self, scene_path, aois, distance=100 ):
 
-                    # get buffered bounding box coordinates
-                    bbox = self.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_image' ], distance=distance )
+        """
+        Placeholder
+        """
 
-                    """
-                    ulx, uly, ulz = coord_rx.TransformPoint( bbox[ 'lrx' ], bbox[ 'lry' ] )
-                    lrx, lry, lrz = coord_rx.TransformPoint( bbox[ 'ulx' ], bbox[ 'uly' ] )
-                    print ( aoi[ 'name' ], ulx, uly, lrx, lry )
-                    """
+        tasks = []
 
-                    if self.overlapsScene( extent, bbox ) is True:
+        # get exported geotiff list
+        files = getFileList( scene_path, '*_B*_*m.tif' )
 
-                        # create aoi sub-path
-                        aoi_path = os.path.join( scene_path, aoi[ 'name'] + '/' )
-                        if not os.path.exists( aoi_path ):
-                            os.makedirs(aoi_path, 0o755 )
+        # one source per band - else group band files sharing folder and resolution into stack
+        groups = {}
+        for f in sorted( files ):
 
-                        # generate aoi sub-image aligned with bbox
-                        aoi_pathname = os.path.join( aoi_path, os.path.basename( f ) )
-                        print ( 'Creating AoI image: {}'.format( aoi_pathname ) )
+            key = ( os.path.dirname( f ), self.getResolution( os.path.basename( f ) ) )
+            if not self._stack:
+                key = key + ( f, )
 
-                        # reproject bbox to local utm and fix pixel resolution
-                        bbox = self.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_local' ], distance=distance )
-                        res_option = self.getResolution( os.path.basename( f ))
+            groups.setdefault( key, [] ).append( f )
 
-                        # reproject bbox to local utm - setup warp options
-                        options = '-t_srs EPSG:{} -tr {} -te {} {} {} {}'. format ( self._epsg, res_option, bbox[ 'ulx'], bbox[ 'lry' ], bbox[ 'lrx' ], bbox[ 'uly'] )
+        for key, group in sorted( groups.items() ):
 
-                        gdal.Warp( aoi_pathname, ds, options=options )
+            # open image
+            ds = self.openSource( group )
+            if ds is not None:
 
-                        # resample 20m resolution sub-image to 10m
-                        if '20m' in aoi_pathname:
+                # get extent and aoi windows - computed once per image grid
+                context = self.getSceneContext( ds, aois, distance=distance )
 
-                            print ( 'Creating resampled AoI image: {}'.format( aoi_pathname.replace( '20m', '10m' ) ) )
+                # one task per overlapping aoi
+                for window in context[ 'windows' ]:
 
-                            # rerun gdalwarp
-                            options = '-t_srs EPSG:{} -tr 10 -10 -te {} {} {} {}'. format ( self._epsg, bbox[ 'ulx'], bbox[ 'lry' ], bbox[ 'lrx' ], bbox[ 'uly'] )
-                            gdal.Warp( aoi_pathname.replace( '20m', '10m' ), ds, options=options )
+                    if window[ 'overlaps' ] is True:
+                        tasks.append( { 'sources' : group, 
+                                        'res' : key[ 1 ], 
+                                        'window' : window, 
+                                        'aoi_path' : os.path.join( scene_path, window[ 'aoi' ][ 'name'] + '/' ) } )
 
-                        # record aoi image location
-                        aoi_paths.append ( aoi_path )
+                ds = None
 
-        return list( set( aoi_paths ) )
+        return tasks
 
 
-    def getExtent( self, ds ):
+    def openSource( self, sources ):
 
         """
         Placeholder
         """
 
-        # create transform
-        geo = ds.GetGeoTransform()
-        return { 
-                    'ulx' : geo[ 0 ],
-                    'uly' : geo[ 3 ],
-                    'lrx' : geo[ 0 ] + ( ds.RasterXSize * geo[ 1 ] ),
-                    'lry' : geo[ 3 ] + ( ds.RasterYSize * geo[ 5 ] )
-        }    
+        # single band image - else separate band vrt stack
+        if not self._stack:
+            return gdal.Open( sources[ 0 ] )
 
+        return gdal.BuildVRT( '', sources, separate=True )
 
-    def getCoordinateTransform( self, ds ):
+
+    def clip( self, task ):
 
         """
         Placeholder
         """
 
-        # retrieve srs from image
-        image = osr.SpatialReference( wkt=ds.GetProjection() )
+        outputs = []
+
+        # create aoi sub-path
+        aoi_path = task[ 'aoi_path' ]
+        if not os.path.exists( aoi_path ):
+            os.makedirs(aoi_path, 0o755, exist_ok=True )
+
+        ds = self.openSource( task[ 'sources' ] )
+        res = task[ 'res' ]
+
+        # generate aoi sub-image aligned with bbox - stack named outside band pattern
+        if self._stack:
+            aoi_pathname = os.path.join( aoi_path, '{}_STACK_{}m.tif'.format( self.getPrefix( task[ 'sources' ][ 0 ] ), res ) )
+            print ( 'Creating AoI stack: {}'.format( aoi_pathname ) )
+        else:
+            aoi_pathname = os.path.join( aoi_path, os.path.basename( task[ 'sources' ][ 0 ] ) )
+            print ( 'Creating AoI image: {}'.format( aoi_pathname ) )
+
+        # target grid in local utm or source crs - fix pixel resolution
+        target = self.getTarget( ds, task[ 'window' ], res )
+        outputs.append( self.clipImage( ds, aoi_pathname, target ) )
+
+        if self._stack and self._split:
+            outputs += self.splitStack( aoi_pathname, [ os.path.join( aoi_path, os.path.basename( f ) ) for f in task[ 'sources' ] ] )
+
+        # resample 20m resolution sub-image to 10m
+        if res == 20:
+
+            pathname = aoi_pathname.replace( '_20m.tif', '_20m_to_10m.tif' ) if self._stack else aoi_pathname.replace( '20m', '10m' )
+            print ( 'Creating resampled AoI image: {}'.format( pathname ) )
 
-        # aoi in lat / lon
-        aoi = osr.SpatialReference()
-        aoi.ImportFromEPSG( 4326 )
+            # derive from clipped aoi image or small source window rather than second pass over full scene
+            aoi_pathname = self.resampleImage( ds, aoi_pathname, pathname, target, 10 )
 
-        # output in local utm
-        local = osr.SpatialReference()
-        local.ImportFromEPSG( self._epsg )
+            outputs.append( aoi_pathname )
+            if self._stack and self._split:
+                outputs += self.splitStack( aoi_pathname, [ os.path.join( aoi_path, os.path.basename( f ).replace( '20m', '10m' ) ) for f in task[ 'sources' ] ] )
 
-        # create transform
-        return { 'aoi_image' : osr.CoordinateTransformation( aoi, image ), 
-                    'aoi_local' : osr.CoordinateTransformation( aoi, local ) }
+        ds = None
+        return outputs
 
 
-    def getBoundingBox( self, aoi, coord_tx, distance=100 ):
+    def resampleImage( self, ds, src, pathname, target, res ):
 
         """
         Placeholder
         """
 
-        # sort lat / lon min and max
-        lat = [ min ( aoi[ 0 ], aoi[ 2 ] ), max( aoi[ 0 ], aoi[ 2 ] ) ]
-        lon = [ min ( aoi[ 1 ], aoi[ 3 ] ), max( aoi[ 1 ], aoi[ 3 ] ) ]
+        # clipped image on source pixel grid - integer upsample of aoi image matches warp of source
+        if target[ 'srcwin' ] is not None and target.get( 'cutline' ) is None:
+            gdal.Translate( pathname, src, xRes=res, yRes=res, resampleAlg=self._resampling )
 
-        # transform lat / lon to image crs
-        ulx, uly, ulz = coord_tx.TransformPoint( lon[ 0 ], lat[ 1 ] )
-        lrx, lry, lrz = coord_tx.TransformPoint( lon[ 1 ], lat[ 0 ] )
+        else:
 
-        # lock to 20m grid
-        ulx = ulx + ( 20.0 - ulx % 20 )
-        uly = uly + ( 20.0 - uly % 20 )
+            # reprojected grid - warp onto finer grid from source window around aoi only
+            vrt_ds = self.getSourceVrt( ds, dict( target, res=( res, -res ) ), resampling=self._resampling )
+            self.clipImage( vrt_ds, pathname, dict( target, res=( res, -res ), srcwin=None ), resampling=self._resampling )
+            vrt_ds = None
 
-        lrx = lrx + ( 20.0 - lrx % 20 )
-        lry = lry + ( 20.0 - lry % 20 )
+        return pathname
 
-        # return bbox window
-        return {
-                    'ulx' : ulx - distance, 
-                    'uly' : uly + distance, 
-                    'lrx' : lrx + distance, 
-                    'lry' : lry - distance 
-        }
 
+    def splitStack( self, pathname, band_pathnames ):
 
-    def overlapsScene( self, extent, bbox ):
+        """
+        Placeholder
+        """
+
+        # copy each band of clipped stack into own file
+        ds = gdal.Open( pathname )
+        for idx, band_pathname in enumerate( band_pathnames ):
+            gdal.Translate( band_pathname, ds, bandList=[ idx + 1 ] )
+
+        ds = None
+        return band_pathnames
+
+
+    def getPrefix( self, pathname ):
 
         """
         Placeholder
         """
 
-        # create scene extent polygon
-        p1 = Polygon( [ ( extent[ 'ulx' ], extent[ 'uly' ] ),
-                        ( extent[ 'lrx' ], extent[ 'uly' ] ),
-                        ( extent[ 'lrx' ], extent[ 'lry' ] ),
-                        ( extent[ 'ulx' ], extent[ 'lry' ] ),
-                        ( extent[ 'ulx' ], extent[ 'uly' ] ) ] )
-        
-        # create aoi polygon
-        p2 = Polygon( [ ( bbox[ 'ulx' ], bbox[ 'uly' ] ),
-                        ( bbox[ 'lrx' ], bbox[ 'uly' ] ),
-                        ( bbox[ 'lrx' ], bbox[ 'lry' ] ),
-                        ( bbox[ 'ulx' ], bbox[ 'lry' ] ),
-                        ( bbox[ 'ulx' ], bbox[ 'uly' ] ) ] )
-        
-        return p1.intersects( p2 )
+        # granule prefix preceding band name
+        filename = os.path.basename( pathname )
+        m = re.search( '_B[0-9A]{2}_[0-9]{2}m', filename )
+
+        return filename[ 0 : m.start() ] if m is not None else os.path.splitext( filename )[ 0 ]
 
 
     def getResolution( self, filename ):
@@ -192,5 +211,5 @@ class Clipper:
         m = re.search( '[0-9]{2}m', filename )
         res = int(re.sub(r'[^\d-]+', '', str(m.group(0) ) ) )
 
-        return '{} {}'.format( res, -res ) 
+        return res
 
@@ -1,12 +1,18 @@
 import os
 import sys
+import time
 import argparse
+import multiprocessing
 
+from osgeo import gdal
+from concurrent.futures import ProcessPoolExecutor
 from clipper import Clipper
 
 sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
 from fs import getPathList
 from dp import getDateTimeString
+from aoi import AoiCatalog
+from worker import initialiseWorker, clipTask
 
 def getSceneList(args):
 
@@ -45,6 +51,48 @@ def parseArguments(args=None):
                         help='batch',
                         dest='batch', action='store_true' )
 
+    # clip in source crs by window read
+    parser.set_defaults(native=False)
+    parser.add_argument('--native',
+                        help='clip in source crs on source pixel grid rather than local utm',
+                        dest='native', action='store_true' )
+
+    # single warp per resolution and aoi
+    parser.set_defaults(stack=False)
+    parser.add_argument('--stack',
+                        help='warp vrt stack of all bands of each resolution once per aoi',
+                        dest='stack', action='store_true' )
+
+    parser.set_defaults(split=False)
+    parser.add_argument('--split',
+                        help='split clipped stacks back into per-band files',
+                        dest='split', action='store_true' )
+
+    # 10m resample of clipped 20m images
+    parser.add_argument('--resampling',
+                        help='resampling algorithm for 10m version of 20m aoi images',
+                        default='near' )
+
+    # aoi polygons - geojson or geopackage
+    parser.add_argument('--aois',
+                        help='vector file of aoi polygons with name field',
+                        default=os.path.join( os.path.dirname( sys.path[0]), '../utility/aois.geojson' ) )
+
+    # mask outside aoi polygon
+    parser.set_defaults(cutline=False)
+    parser.add_argument('--cutline',
+                        help='mask aoi images outside aoi polygon',
+                        dest='cutline', action='store_true' )
+
+    # task parallelism
+    parser.add_argument('--workers',
+                        help='number of clip processes',
+                        type=int, default=1 )
+
+    parser.add_argument('--threads',
+                        help='gdal threads per clip process - default cores / workers',
+                        type=int, default=None )
+
     return parser.parse_args(args)
 
 
@@ -56,30 +104,41 @@ def main():
 
     # parse arguments
     args = parseArguments()
+    kwargs = { 'native' : args.native, 'stack' : args.stack, 'split' : args.split, 'resampling' : args.resampling, 'cutline' : args.cutline }
+
+    # load aoi catalog
+    aois = AoiCatalog( args.aois )
+
+    # collect (scene, band, aoi) clip tasks
+    obj = Clipper( **kwargs )
+    tasks = []
 
-    # define aois
-    aois = [ 
-        {   'name' : 'shokpar',
-            'bbox' : [ 43.1547, 74.8458, 43.1692, 74.8853 ]
-        },
-        {   'name' : 'gargarinskoye',
-            'bbox' : [ 43.3863, 74.6333, 43.4083, 74.6741 ]
-        },
-        {   'name' : 'alaygyr',
-            'bbox' : [ 49.0279, 74.4044, 49.0446, 74.4551 ]
-        },
-        {   'name' : 'kairakty',
-            'bbox' : [ 48.6708, 73.2317, 48.7014, 73.2972 ]
-        } 
-        ]
-
-    # for each scene
     scenes = getSceneList( args )
     for scene in scenes:
+        tasks += obj.getTasks( scene, aois, distance=10000 )
+
+    start = time.time()
+    workers = max( 1, min( args.workers, len( tasks ) ) )
+    threads = args.threads if args.threads is not None else max( 1, multiprocessing.cpu_count() // workers )
+
+    if workers > 1:
+
+        # create aoi sub-images in process pool
+        with ProcessPoolExecutor( max_workers=workers, initializer=initialiseWorker, initargs=( Clipper, threads, kwargs ) ) as pool:
+            results = list( pool.map( clipTask, tasks ) )
+
+    else:
+
+        # create aoi sub-images in this process
+        initialiseWorker( Clipper, threads, kwargs )
+        results = [ clipTask( task ) for task in tasks ]
+
+    # report throughput
+    elapsed = max( time.time() - start, 1e-6 )
+    clips = sum( r[ 0 ] for r in results ); nbytes = sum( r[ 1 ] for r in results )
 
-        # create aoi sub-images
-        obj = Clipper()
-        obj.process( scene, aois, distance=10000 )
+    print ( 'Clipped {} images from {} scenes in {:.1f}s with {} workers - {:.2f} clips/s {:.2f} MB/s'.format( 
+                clips, len( scenes ), elapsed, workers, clips / elapsed, nbytes / elapsed / 1e6 ) )
 
     return
 
@@ -0,0 +1,163 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+from osgeo import gdal, ogr, osr
+from exporter import Exporter
+
+
+def getBand( pathname, size, driver ):
+
+    """
+    Placeholder
+    """
+
+    # synthetic 10m band - surface reflectance counts on utm grid
+    rng = np.random.default_rng( 0 )
+    data = rng.integers( 1, 10000, size=( size, size ), dtype=np.uint16 )
+
+    mem_ds = gdal.GetDriverByName( 'MEM' ).Create( '', size, size, 1, gdal.GDT_UInt16 )
+    mem_ds.SetGeoTransform( ( 399960.0, 10.0, 0.0, 4800000.0, 0.0, -10.0 ) )
+    mem_ds.SetProjection( getSrs().ExportToWkt() )
+    mem_ds.GetRasterBand( 1 ).WriteArray( data )
+
+    # encode as jp2 where driver available - else uncompressed geotiff
+    ds = gdal.GetDriverByName( driver ).CreateCopy( pathname, mem_ds )
+    ds = None; mem_ds = None
+
+    return pathname
+
+
+def getSrs():
+
+    """
+    Placeholder
+    """
+
+    # utm zone 43n
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG( 32643 )
+
+    return srs
+
+
+def getMask( size, count ):
+
+    """
+    Placeholder
+    """
+
+    # in-memory layer of square cloud polygons scattered over band
+    mask_ds = gdal.GetDriverByName( 'Memory' ).Create( '', 0, 0, 0, gdal.GDT_Unknown )
+    layer = mask_ds.CreateLayer( 'clouds', srs=getSrs(), geom_type=ogr.wkbPolygon )
+
+    rng = np.random.default_rng( 1 )
+    for i in range( count ):
+
+        x = 399960.0 + rng.uniform( 0, size * 10.0 ); y = 4800000.0 - rng.uniform( 0, size * 10.0 )
+        half = rng.uniform( 500.0, 5000.0 )
+
+        feature = ogr.Feature( layer.GetLayerDefn() )
+        feature.SetGeometry( ogr.CreateGeometryFromWkt( 'POLYGON (({0} {1},{2} {1},{2} {3},{0} {3},{0} {1}))'.format( x - half, y - half, x + half, y + half ) ) )
+        layer.CreateFeature( feature )
+
+    return mask_ds
+
+
+def convertLegacy( obj, src, pathname, mask_ds ):
+
+    """
+    Placeholder
+    """
+
+    # copy, reopen in update mode and burn clouds - as per original exportToGeoTiff
+    in_ds = gdal.Open( src )
+    out_ds = gdal.GetDriverByName( 'GTiff' ).CreateCopy( pathname, in_ds, options=obj.options )
+    out_ds = None; in_ds = None
+
+    scene_ds = gdal.Open( pathname, gdal.GA_Update )
+    scene_ds.GetRasterBand( 1 ).SetNoDataValue( 0 )
+    gdal.Rasterize( scene_ds, mask_ds, bands = [1], burnValues = [0] )
+    scene_ds = None
+
+    return pathname
+
+
+def convertSinglePass( obj, src, pathname, mask_ds ):
+
+    """
+    Placeholder
+    """
+
+    # streamed strips with cached mask - mask rasterisation included in timing
+    obj._masks = {}
+    return obj.convertImage( src, pathname, mask=mask_ds )
+
+
+def parseArguments(args=None):
+
+    """
+    Placeholder
+    """
+
+    # parse command line arguments
+    parser = argparse.ArgumentParser(description='sentinel-2 exporter benchmark')
+    parser.add_argument('-s', '--size', action="store", type=int, default=10980 )
+    parser.add_argument('-c', '--clouds', action="store", type=int, default=50 )
+    parser.add_argument('-n', '--repeat', action="store", type=int, default=3 )
+    parser.add_argument('-o', '--out_path', action="store", default=None )
+
+    return parser.parse_args(args)
+
+
+def main():
+
+    """
+    Placeholder
+    """
+
+    # parse arguments
+    args = parseArguments()
+    gdal.UseExceptions()
+
+    out_path = args.out_path if args.out_path is not None else tempfile.mkdtemp()
+    if not os.path.exists( out_path ):
+        os.makedirs( out_path, 0o755 )
+
+    # synthetic source band and cloud layer
+    driver = 'JP2OpenJPEG' if gdal.GetDriverByName( 'JP2OpenJPEG' ) is not None else 'GTiff'
+    src = getBand( os.path.join( out_path, 'T43TGK_B02_10m' + ( '.jp2' if driver != 'GTiff' else '.src.tif' ) ), args.size, driver )
+    mask_ds = getMask( args.size, args.clouds )
+
+    obj = Exporter()
+    results = {}
+
+    print ( 'Source: {} ({}) {}x{}'.format( os.path.basename( src ), driver, args.size, args.size ) )
+    for name, fn in [ ( 'legacy', convertLegacy ), ( 'single', convertSinglePass ) ]:
+
+        pathname = os.path.join( out_path, name + '.tif' )
+
+        start = time.perf_counter()
+        for i in range( args.repeat ):
+            fn( obj, src, pathname, mask_ds )
+
+        elapsed = ( time.perf_counter() - start ) / args.repeat
+        results[ name ] = gdal.Open( pathname ).ReadAsArray()
+
+        print ( '{:<8} {:8.2f}s {:10.1f} MB'.format( name, elapsed, os.path.getsize( pathname ) / 1e6 ) )
+
+    # check outputs agree
+    if not np.array_equal( results[ 'legacy' ], results[ 'single' ] ):
+        print ( 'Output mismatch: {} pixels differ'.format( np.count_nonzero( results[ 'legacy' ] != results[ 'single' ] ) ) )
+
+    if args.out_path is None:
+        shutil.rmtree( out_path )
+
+    return
+
+# execute main
+if __name__ == '__main__':
+    main()
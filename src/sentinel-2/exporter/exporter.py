@@ -1,15 +1,20 @@
 import os
 import sys
 import argparse
+import time
 import shutil
+import re
+import fnmatch
+import threading
+import multiprocessing
 
 from osgeo import gdal, ogr
 from zipfile import ZipFile
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
 from fs import getFileList, getFile
 from srs import getEpsgCode
-import ogr2ogr
 
 class Exporter:
 
@@ -18,7 +23,10 @@ class Exporter:
     images_20m = [ '*B05_20m.jp2', '*B06_20m.jp2', '*B07_20m.jp2', '*B11_20m.jp2', '*B12_20m.jp2' ]
     images_60m = [ '*B01_60m.jp2', '*B09_60m.jp2' ]
 
-    def __init__(self ):
+    # geotiff creation options
+    options = [ 'TILED=YES', 'COMPRESS=DEFLATE', 'INTERLEAVE=PIXEL', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256', 'NBITS=16', 'NUM_THREADS=2' ]
+
+    def __init__(self, vsizip=False, workers=1, threads=None, stack=None, resampling='near' ):
 
         """
         Placeholder
@@ -28,6 +36,24 @@ class Exporter:
         os.environ['GDAL_CACHEMAX'] = '2048'
         gdal.UseExceptions()
 
+        # read bands straight from SAFE zip rather than extracting
+        self._vsizip = vsizip
+        self._members = set()
+
+        # optional 10m band stack per granule - vrt or tif
+        self._stack = stack
+        self._resampling = resampling
+
+        # cloud masks rasterised once per resolution grid - shared by band workers
+        self._masks = {}
+        self._lock = threading.Lock()
+
+        # concurrent band conversions - split cores between jp2 decoder threads of each worker
+        self._workers = max( 1, workers )
+        if threads is None:
+            threads = max( 1, multiprocessing.cpu_count() // self._workers )
+
+        gdal.SetConfigOption( 'GDAL_NUM_THREADS', str( threads ) )
         return
 
 
@@ -45,24 +71,41 @@ class Exporter:
         # postpone export if path exists and no overwrite
         if not os.path.exists( out_path ) or overwrite:
 
-            # extract SAFE zip into tmp folder
-            with ZipFile( scene, 'r' ) as zipObj:
-                zipObj.extractall( os.path.join( raw_path, 'tmp/' ) )
+            # open SAFE zip through gdal virtual file system - else extract into tmp folder
+            if self._vsizip:
+                scene_path = '/vsizip/' + os.path.abspath( scene )
+                self._members = set()
+
+            else:
+                scene_path = raw_path
+                with ZipFile( scene, 'r' ) as zipObj:
+                    zipObj.extractall( os.path.join( raw_path, 'tmp/' ) )
 
             # initialise output path
             if not os.path.exists( out_path ):
                 os.makedirs( out_path, 0o755 )
 
-            # get cloud mask
-            mask_pathname = self.getCloudMask( raw_path, out_path )
+            # get in-memory cloud mask
+            self._masks = {}
+            mask_ds = self.getCloudMask( scene_path )
+
+            # export all bands to geotiff
+            pathnames = self.exportToGeoTiff( scene_path, out_path, self.images_60m + self.images_20m + self.images_10m, mask=mask_ds )
+            mask_ds = None; self._masks = {}
+
+            # resample bands once per scene into 10m stack
+            if self._stack is not None:
+                self.createStack( pathnames, out_path )
 
-            # export to geotiff
-            self.exportToGeoTiff( raw_path, out_path, self.images_60m, mask=mask_pathname )
-            self.exportToGeoTiff( raw_path, out_path, self.images_20m, mask=mask_pathname )
-            self.exportToGeoTiff( raw_path, out_path, self.images_10m, mask=mask_pathname )
+            if self._vsizip:
 
-            # remove decompressed sub-directory
-            shutil.rmtree( os.path.join( raw_path, 'tmp/' ) )
+                # report archive members read against full extraction
+                self.reportArchiveUsage( scene )
+
+            else:
+
+                # remove decompressed sub-directory
+                shutil.rmtree( os.path.join( raw_path, 'tmp/' ) )
 
         else:
             # report export bypass
@@ -71,29 +114,96 @@ class Exporter:
         return out_path
 
 
-    def getCloudMask( self, raw_path, out_path ):
+    def getSourceFile( self, scene_path, pattern ):
 
         """
         Placeholder
         """
 
-        mask_pathname = None 
+        # search folder on disk
+        if not scene_path.startswith( '/vsizip/' ):
+            return getFile( scene_path, pattern )
+
+        # get uniquely named member of zip archive
+        result = None
+        filelist = [ f for f in gdal.ReadDirRecursive( scene_path ) if fnmatch.fnmatch( os.path.basename( f ), pattern ) ]
+
+        if len ( filelist ) == 1:
+            result = scene_path + '/' + filelist[ 0 ]
+            self._members.add( filelist[ 0 ] )
+
+        return result
+
+
+    def reportArchiveUsage( self, scene ):
+
+        """
+        Placeholder
+        """
+
+        # compare compressed size of members read with size of full extraction
+        with ZipFile( scene, 'r' ) as zipObj:
+            members = zipObj.infolist()
+
+        extracted = sum( m.file_size for m in members )
+        read = sum( m.compress_size for m in members if m.filename in self._members )
+
+        print ( 'Archive bytes read: {:.1f} MB ({} members) vs extracted: {:.1f} MB ({} members)'.format( read / 1e6, len( self._members ), extracted / 1e6, len( members ) ) )
+        return
+
+
+    def getCloudMask( self, raw_path ):
+
+        """
+        Placeholder
+        """
+
+        mask_ds = None 
 
         # find gml
-        gml = getFile( raw_path, '*CLOUDS*.gml' )
+        gml = self.getSourceFile( raw_path, '*CLOUDS*.gml' )
         if gml is not None:
 
             # projection not parsed correctly from l2a gml - retrieve from scene raster
-            scene = getFile( raw_path, '*B02_10m.jp2' )
+            scene = self.getSourceFile( raw_path, '*B02_10m.jp2' )
             if scene is not None:
                 epsg = getEpsgCode( scene )
 
-                # generate shape file using raster epsg
-                shp = os.path.join( out_path, 'clouds.shp' )
-                if ogr2ogr.main( [ "", "-f", "ESRI Shapefile", "-a_srs", 'EPSG:' + epsg, shp, gml ] ) is True:
-                    mask_pathname = shp
+                # translate into in-memory layer assigned raster epsg - unreadable or featureless gml is no mask
+                try:
+                    mask_ds = gdal.VectorTranslate( '', gml, format='Memory', dstSRS='EPSG:' + str( epsg ), reproject=False )
+                except RuntimeError as e:
+                    print ( 'Unable to read cloud mask {}: {}'.format( gml, e ) )
+                    mask_ds = None
+
+                if mask_ds is not None:
+                    if mask_ds.GetLayerCount() == 0 or sum( mask_ds.GetLayer( idx ).GetFeatureCount() for idx in range( mask_ds.GetLayerCount() ) ) == 0:
+                        mask_ds = None
+
+        return mask_ds
+
+
+    def getMaskArray( self, mask_ds, ds ):
+
+        """
+        Placeholder
+        """
+
+        # one rasterisation per resolution grid - cached for remaining bands
+        key = ( ds.GetGeoTransform(), ds.RasterXSize, ds.RasterYSize )
+        with self._lock:
 
-        return mask_pathname
+            if key not in self._masks:
+
+                mem_ds = gdal.GetDriverByName( 'MEM' ).Create( '', ds.RasterXSize, ds.RasterYSize, 1, gdal.GDT_Byte )
+                mem_ds.SetGeoTransform( ds.GetGeoTransform() )
+                mem_ds.SetProjection( ds.GetProjection() )
+
+                gdal.Rasterize( mem_ds, mask_ds, bands = [1], burnValues = [1] )
+                self._masks[ key ] = mem_ds.GetRasterBand( 1 ).ReadAsArray() > 0
+                mem_ds = None
+
+        return self._masks[ key ]
 
 
     def exportToGeoTiff( self, scene_path, out_path, images, mask=None ):
@@ -102,58 +212,125 @@ class Exporter:
         Placeholder
         """
 
-        def createCopy( src, out_path ):
+        def exportImage( image ):
 
             """
             Placeholder
             """
 
-            # open jp2 image            
-            in_ds = gdal.Open( src  )
-            driver = gdal.GetDriverByName( 'GTiff' )
+            # find file 
+            src = self.getSourceFile( scene_path, image )
+            if src is not None:
 
-            # recreate as geotiff
-            pathname = out_path + '/' + os.path.splitext( os.path.basename( src ) )[0] + '.tif' 
-            out_ds = driver.CreateCopy( pathname, in_ds, options=[ 'TILED=YES', 'COMPRESS=DEFLATE', 'INTERLEAVE=PIXEL', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256', 'NBITS=16', 'NUM_THREADS=2' ] )
+                # single pass conversion with cloud mask applied in memory
+                start = time.time()
+                pathname = out_path + '/' + os.path.splitext( os.path.basename( src ) )[0] + '.tif' 
+                self.convertImage( src, pathname, mask=mask )
 
-            # close datasets
-            out_ds = None
-            in_ds = None
-            
-            return pathname
+                print ( 'Exported to geotiff: {} ({:.1f}s)'.format( src, time.time() - start ) ) 
+                return pathname
 
-        # open cloud mask 
-        mask_ds = None
-        if mask is not None and os.path.isfile( mask ):
-            mask_ds  = gdal.OpenEx( mask, gdal.OF_VECTOR ) 
+            else:
 
-        # for each entry in list
-        for image in images:
+                # report missing file
+                print ( 'Unable to locate file {} in path: {}'.format( image, scene_path ) )            
 
-            # find file 
-            src = getFile( scene_path, image )
-            if src is not None:
+            return None
 
-                # create geotiff copy
-                print ( 'Exporting to geotiff: {}'.format( src ) )            
-                pathname = createCopy( src, out_path )
+        # convert bands concurrently
+        with ThreadPoolExecutor( max_workers=self._workers ) as pool:
+            pathnames = list( pool.map( exportImage, images ) )
 
-                scene_ds = gdal.Open( pathname, gdal.GA_Update )
-                if scene_ds is not None:
+        return [ pathname for pathname in pathnames if pathname is not None ]
 
-                    # burn cloud polygons into image as no data
-                    scene_ds.GetRasterBand( 1 ).SetNoDataValue( 0 )
-                    if mask_ds is not None:
-                        gdal.Rasterize( scene_ds, mask_ds, bands = [1], burnValues = [0] )
 
-                    scene_ds = None 
+    def convertImage( self, src, pathname, mask=None, block_rows=1024 ):
 
-                print ( 'OK!' ) 
+        """
+        Placeholder
+        """
 
-            else:
+        # open jp2 image
+        in_ds = gdal.Open( src )
+        in_band = in_ds.GetRasterBand( 1 )
 
-                # burn cloud polygons into image as no data
-                print ( 'Unable to locate file {} in path: {}'.format( image, scene_path ) )            
+        # create geotiff with original creation options
+        driver = gdal.GetDriverByName( 'GTiff' )
+        out_ds = driver.Create( pathname, in_ds.RasterXSize, in_ds.RasterYSize, 1, in_band.DataType, 
+                                options=self.options )
 
-        return
+        out_ds.SetGeoTransform( in_ds.GetGeoTransform() )
+        out_ds.SetProjection( in_ds.GetProjection() )
+        out_ds.SetMetadata( in_ds.GetMetadata() )
+
+        out_band = out_ds.GetRasterBand( 1 )
+        out_band.SetNoDataValue( 0 )
+
+        # cloud mask rasterised on band grid
+        cloud = None
+        if mask is not None:
+            cloud = self.getMaskArray( mask, in_ds )
+            if not cloud.any():
+                cloud = None
+
+        # stream strips aligned to tile rows - each tile compressed once
+        block_rows = max( 256, block_rows - block_rows % 256 )
+        for row in range( 0, in_ds.RasterYSize, block_rows ):
+
+            rows = min( block_rows, in_ds.RasterYSize - row )
+            data = in_band.ReadAsArray( 0, row, in_ds.RasterXSize, rows )
+
+            if cloud is not None:
+                data[ cloud[ row : row + rows ] ] = 0
+
+            out_band.WriteArray( data, 0, row )
+
+        # close datasets
+        out_ds = None
+        in_ds = None
+
+        return pathname
+
+
+    def createStack( self, pathnames, out_path ):
+
+        """
+        Placeholder
+        """
+
+        # order bands by band number
+        bands = {}
+        for pathname in pathnames:
+            m = re.search( '_(B[0-9A]{2})_[0-9]{2}m.tif$', pathname )
+            if m is not None:
+                bands[ m.group( 1 ) ] = pathname
+
+        if len( bands ) == 0:
+            return None
+
+        names = sorted( bands.keys() )
+        sources = [ bands[ name ] for name in names ]
+
+        # stack named outside clipper band pattern '*_B*_*m.tif'
+        prefix = os.path.basename( sources[ 0 ] )
+        prefix = prefix[ 0 : prefix.find( '_' + names[ 0 ] + '_' ) ]
+
+        pathname = os.path.join( out_path, prefix + '_STACK_10m.' + self._stack )
+        vrt_pathname = pathname if self._stack == 'vrt' else ''
+
+        # separate band vrt resampled onto 10m grid
+        print ( 'Creating 10m stack: {}'.format( pathname ) )
+        vrt_ds = gdal.BuildVRT( vrt_pathname, sources, separate=True, resolution='user', xRes=10, yRes=10, 
+                                resampleAlg=self._resampling, srcNodata=0, VRTNodata=0 )
+
+        for idx, name in enumerate( names ):
+            vrt_ds.GetRasterBand( idx + 1 ).SetDescription( name )
+
+        # materialise as tiled pixel-interleaved geotiff
+        if self._stack == 'tif':
+
+            out_ds = gdal.Translate( pathname, vrt_ds, creationOptions=self.options )
+            out_ds = None
 
+        vrt_ds = None
+        return pathname
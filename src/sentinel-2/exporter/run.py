@@ -38,6 +38,30 @@ def parseArguments(args=None):
                         help='batch',
                         dest='batch', action='store_true' )
 
+    # read bands from zip via /vsizip/
+    parser.set_defaults(vsizip=False)
+    parser.add_argument('--vsizip',
+                        help='read bands directly from SAFE zip without extraction',
+                        dest='vsizip', action='store_true' )
+
+    # band parallelism
+    parser.add_argument('--workers',
+                        help='number of concurrent band conversions',
+                        type=int, default=1 )
+
+    parser.add_argument('--threads',
+                        help='jp2 decoder threads per conversion - default cores / workers',
+                        type=int, default=None )
+
+    # resampled 10m band stack per granule
+    parser.add_argument('--stack',
+                        help='write 10m multi-band stack as vrt or tif',
+                        choices=[ 'vrt', 'tif' ], default=None )
+
+    parser.add_argument('--resampling',
+                        help='resampling algorithm for 10m stack',
+                        default='near' )
+
     return parser.parse_args(args)
 
 
@@ -49,7 +73,7 @@ def main():
 
     # parse arguments
     args = parseArguments()
-    obj = Exporter()
+    obj = Exporter( vsizip=args.vsizip, workers=args.workers, threads=args.threads, stack=args.stack, resampling=args.resampling )
 
     # for each scene
     scenes = getSceneList( args )
@@ -8,6 +8,7 @@ from processor import Processor
 sys.path.append( os.path.join( os.path.dirname( sys.path[0]), '../utility' ) )
 from fs import getPathList
 from dp import getDateTimeString, getTle
+from aoi import AoiCatalog
 
 
 def getRootPath( scene ):
@@ -60,6 +61,11 @@ def parseArguments(args=None):
                         help='batch',
                         dest='batch', action='store_true' )
 
+    # aoi polygons - geojson or geopackage
+    parser.add_argument('--aois',
+                        help='vector file of aoi polygons with name field',
+                        default=os.path.join( os.path.dirname( sys.path[0]), '../utility/aois.geojson' ) )
+
     return parser.parse_args(args)
 
 
@@ -73,21 +79,8 @@ def main():
     args = parseArguments()
     root = getRootPath( args.scene )
 
-    # define aois
-    aois = [ 
-        {   'name' : 'shokpar',
-            'bbox' : [ 43.1547, 74.8458, 43.1692, 74.8853 ]
-        },
-        {   'name' : 'gargarinskoye',
-            'bbox' : [ 43.3863, 74.6333, 43.4083, 74.6741 ]
-        },
-        {   'name' : 'alaygyr',
-            'bbox' : [ 49.0279, 74.4044, 49.0446, 74.4551 ]
-        },
-        {   'name' : 'kairakty',
-            'bbox' : [ 48.6708, 73.2317, 48.7014, 73.2972 ]
-        } 
-        ]
+    # load aoi catalog
+    aois = AoiCatalog( args.aois )
 
     # create object and get unique datetimes
     datetimes = getDateTimeList( args )
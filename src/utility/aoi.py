@@ -0,0 +1,110 @@
+import os
+import numpy as np
+
+from osgeo import ogr, osr
+from shapely import wkt
+from shapely.strtree import STRtree
+
+
+class AoiCatalog:
+
+    def __init__( self, pathname, layer=None, field='name' ):
+
+        """
+        Placeholder
+        """
+
+        # vector file of aoi polygons - geojson, geopackage or any ogr format
+        self._pathname = os.path.abspath( pathname )
+        self._field = field
+
+        self._aois = []
+        self._geometries = []
+
+        ds = ogr.Open( self._pathname )
+        if ds is None:
+            raise IOError( 'Unable to open aoi catalog: {}'.format( pathname ) )
+
+        lyr = ds.GetLayerByName( layer ) if layer is not None else ds.GetLayer( 0 )
+        self._layer = lyr.GetName()
+
+        # aoi polygons held in lat / lon - lon, lat axis order
+        t_srs = osr.SpatialReference()
+        t_srs.ImportFromEPSG( 4326 )
+
+        coord_tx = None
+        s_srs = lyr.GetSpatialRef()
+        if s_srs is not None and not s_srs.IsSame( t_srs ):
+
+            # gdal 3 defaults to authority axis order
+            if hasattr( t_srs, 'SetAxisMappingStrategy' ):
+                t_srs.SetAxisMappingStrategy( osr.OAMS_TRADITIONAL_GIS_ORDER )
+                s_srs.SetAxisMappingStrategy( osr.OAMS_TRADITIONAL_GIS_ORDER )
+
+            coord_tx = osr.CoordinateTransformation( s_srs, t_srs )
+
+        for feature in lyr:
+
+            geom = feature.GetGeometryRef()
+            if geom is None:
+                continue
+
+            geom = geom.Clone()
+            if coord_tx is not None:
+                geom.Transform( coord_tx )
+
+            # bbox as lat / lon pairs - as per original hard-coded aois
+            minx, maxx, miny, maxy = geom.GetEnvelope()
+
+            # cutline filter - quote identifier and double single quotes in name
+            name = feature.GetField( field )
+            where = '"{}" = \'{}\''.format( field.replace( '"', '""' ), str( name ).replace( "'", "''" ) )
+
+            self._aois.append( {    'name' : name,
+                                    'bbox' : [ miny, minx, maxy, maxx ],
+                                    'cutline' : { 'source' : self._pathname, 'layer' : self._layer, 'where' : where } } )
+
+            self._geometries.append( wkt.loads( geom.ExportToWkt() ) )
+
+        ds = None
+
+        # build r-tree over aoi polygons - shapely returns integer indices into aoi list
+        self._tree = STRtree( self._geometries ) if len( self._geometries ) > 0 else None
+
+        # cache key shared by clippers
+        self.key = ( self._pathname, self._layer, field )
+        return
+
+
+    def __len__( self ):
+
+        """
+        Placeholder
+        """
+
+        return len( self._aois )
+
+
+    def __iter__( self ):
+
+        """
+        Placeholder
+        """
+
+        return iter( self._aois )
+
+
+    def query( self, footprint ):
+
+        """
+        Placeholder
+        """
+
+        # aois with polygons intersecting lat / lon footprint
+        result = []
+        if self._tree is not None:
+
+            idx = np.asarray( self._tree.query( footprint, predicate='intersects' ), dtype=int )
+            result = [ self._aois[ i ] for i in sorted( idx ) ]
+
+        return result
@@ -0,0 +1,326 @@
+import math
+
+from osgeo import gdal, osr
+from shapely.geometry.polygon import Polygon
+from shapely.geometry import box
+
+
+# resampling kernel radius in source pixels - unknown kernels get widest radius
+kernels = { 'near' : 1, 'nearest' : 1, 'bilinear' : 1, 'cubic' : 2, 'cubicspline' : 2, 'lanczos' : 3 }
+
+
+class AoiGrid:
+
+    def __init__( self, lock, native=False, cutline=False, epsg=28412 ):
+
+        """
+        Placeholder
+        """
+
+        self._epsg = epsg
+
+        # aoi bbox snapped to sensor grid spacing
+        self._lock = lock
+
+        # optionally clip in source crs on source pixel grid
+        self._native = native
+
+        # mask clipped images outside aoi polygon
+        self._cutline = cutline
+
+        # per-scene transforms and aoi windows shared by all bands
+        self._transforms = {}
+        self._contexts = {}
+
+        return
+
+
+    def getSceneContext( self, ds, aois, distance=100 ):
+
+        """
+        Placeholder
+        """
+
+        # bands of scene sharing crs and grid reuse context
+        key = ( ds.GetProjection(), ds.GetGeoTransform(), ds.RasterXSize, ds.RasterYSize, distance,
+                    getattr( aois, 'key', None ) or tuple( ( aoi[ 'name' ], tuple( aoi[ 'bbox' ] ) ) for aoi in aois ) )
+
+        if key not in self._contexts:
+
+            extent = self.getExtent( ds )
+            coord_tx = self.getCoordinateTransform( ds )
+
+            # aoi catalog spatial index selects candidates - else test every aoi
+            candidates = aois
+            if hasattr( aois, 'query' ):
+                candidates = aois.query( self.getFootprint( extent, coord_tx[ 'image_aoi' ], distance=distance ) )
+
+            # buffered aoi windows in image and local crs
+            windows = []
+            for aoi in candidates:
+
+                bbox = self.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_image' ], distance=distance )
+                windows.append( {   'aoi' : aoi,
+                                    'image' : bbox,
+                                    'local' : self.getBoundingBox( aoi[ 'bbox'], coord_tx[ 'aoi_local' ], distance=distance ),
+                                    'overlaps' : self.overlapsScene( extent, bbox ) } )
+
+            self._contexts[ key ] = { 'extent' : extent, 'windows' : windows }
+
+        return self._contexts[ key ]
+
+
+    def getExtent( self, ds ):
+
+        """
+        Placeholder
+        """
+
+        # create transform
+        geo = ds.GetGeoTransform()
+        return {
+                    'ulx' : geo[ 0 ],
+                    'uly' : geo[ 3 ],
+                    'lrx' : geo[ 0 ] + ( ds.RasterXSize * geo[ 1 ] ),
+                    'lry' : geo[ 3 ] + ( ds.RasterYSize * geo[ 5 ] )
+        }
+
+
+    def getCoordinateTransform( self, ds ):
+
+        """
+        Placeholder
+        """
+
+        # reuse transforms for images sharing projection
+        prj = ds.GetProjection()
+        if prj in self._transforms:
+            return self._transforms[ prj ]
+
+        # retrieve srs from image
+        image = osr.SpatialReference( wkt=prj )
+
+        # aoi in lat / lon
+        aoi = osr.SpatialReference()
+        aoi.ImportFromEPSG( 4326 )
+
+        # output in local utm
+        local = osr.SpatialReference()
+        local.ImportFromEPSG( self._epsg )
+
+        # create transform - record whether image already in local crs
+        self._transforms[ prj ] = { 'aoi_image' : osr.CoordinateTransformation( aoi, image ),
+                                    'image_aoi' : osr.CoordinateTransformation( image, aoi ),
+                                    'aoi_local' : osr.CoordinateTransformation( aoi, local ),
+                                    'local' : image.IsSame( local ) == 1 }
+
+        return self._transforms[ prj ]
+
+
+    def getBoundingBox( self, aoi, coord_tx, distance=100 ):
+
+        """
+        Placeholder
+        """
+
+        # sort lat / lon min and max
+        lat = [ min ( aoi[ 0 ], aoi[ 2 ] ), max( aoi[ 0 ], aoi[ 2 ] ) ]
+        lon = [ min ( aoi[ 1 ], aoi[ 3 ] ), max( aoi[ 1 ], aoi[ 3 ] ) ]
+
+        # transform lat / lon to image crs
+        ulx, uly, ulz = coord_tx.TransformPoint( lon[ 0 ], lat[ 1 ] )
+        lrx, lry, lrz = coord_tx.TransformPoint( lon[ 1 ], lat[ 0 ] )
+
+        # lock to sensor grid
+        lock = float( self._lock )
+        ulx = ulx + ( lock - ulx % lock )
+        uly = uly + ( lock - uly % lock )
+
+        lrx = lrx + ( lock - lrx % lock )
+        lry = lry + ( lock - lry % lock )
+
+        # return bbox window
+        return {
+                    'ulx' : ulx - distance,
+                    'uly' : uly + distance,
+                    'lrx' : lrx + distance,
+                    'lry' : lry - distance
+        }
+
+
+    def getFootprint( self, extent, coord_tx, distance=100 ):
+
+        """
+        Placeholder
+        """
+
+        # buffered scene extent corners in lat / lon
+        points = []
+        for x, y in [ ( extent[ 'ulx' ] - distance, extent[ 'uly' ] + distance ), ( extent[ 'lrx' ] + distance, extent[ 'uly' ] + distance ),
+                        ( extent[ 'lrx' ] + distance, extent[ 'lry' ] - distance ), ( extent[ 'ulx' ] - distance, extent[ 'lry' ] - distance ) ]:
+
+            lon, lat, z = coord_tx.TransformPoint( x, y )
+            points.append( ( lon, lat ) )
+
+        # bounding box of transformed corners
+        lon = [ p[ 0 ] for p in points ]; lat = [ p[ 1 ] for p in points ]
+        return box( min( lon ), min( lat ), max( lon ), max( lat ) )
+
+
+    def overlapsScene( self, extent, bbox ):
+
+        """
+        Placeholder
+        """
+
+        # create scene extent polygon
+        p1 = Polygon( [ ( extent[ 'ulx' ], extent[ 'uly' ] ),
+                        ( extent[ 'lrx' ], extent[ 'uly' ] ),
+                        ( extent[ 'lrx' ], extent[ 'lry' ] ),
+                        ( extent[ 'ulx' ], extent[ 'lry' ] ),
+                        ( extent[ 'ulx' ], extent[ 'uly' ] ) ] )
+
+        # create aoi polygon
+        p2 = Polygon( [ ( bbox[ 'ulx' ], bbox[ 'uly' ] ),
+                        ( bbox[ 'lrx' ], bbox[ 'uly' ] ),
+                        ( bbox[ 'lrx' ], bbox[ 'lry' ] ),
+                        ( bbox[ 'ulx' ], bbox[ 'lry' ] ),
+                        ( bbox[ 'ulx' ], bbox[ 'uly' ] ) ] )
+
+        return p1.intersects( p2 )
+
+
+    def getTarget( self, ds, window, res ):
+
+        """
+        Placeholder
+        """
+
+        geo = ds.GetGeoTransform()
+        if self._native:
+
+            # snap image crs window outward onto grid at requested resolution anchored on source origin
+            bbox = window[ 'image' ]
+            dx = math.copysign( res, geo[ 1 ] ); dy = math.copysign( res, geo[ 5 ] )
+
+            x0 = math.floor( ( bbox[ 'ulx' ] - geo[ 0 ] ) / dx ); x1 = math.ceil( ( bbox[ 'lrx' ] - geo[ 0 ] ) / dx )
+            y0 = math.floor( ( bbox[ 'uly' ] - geo[ 3 ] ) / dy ); y1 = math.ceil( ( bbox[ 'lry' ] - geo[ 3 ] ) / dy )
+
+            target = {  'srs' : ds.GetProjection(),
+                        'res' : ( dx, dy ),
+                        'bbox' : { 'ulx' : geo[ 0 ] + x0 * dx, 'uly' : geo[ 3 ] + y0 * dy,
+                                    'lrx' : geo[ 0 ] + x1 * dx, 'lry' : geo[ 3 ] + y1 * dy } }
+
+        else:
+
+            # local utm grid at fixed resolution
+            target = { 'srs' : 'EPSG:{}'.format( self._epsg ), 'res' : ( res, -res ), 'bbox' : window[ 'local' ] }
+
+        # aoi polygon cutline - catalog aois only
+        if self._cutline and 'cutline' in window[ 'aoi' ]:
+            target[ 'cutline' ] = window[ 'aoi' ][ 'cutline' ]
+
+        target[ 'srcwin' ] = self.getSourceWindow( ds, target )
+        return target
+
+
+    def getSourceWindow( self, ds, target ):
+
+        """
+        Placeholder
+        """
+
+        # source crs must match target - always the case in native mode
+        if not self._native and not self.getCoordinateTransform( ds )[ 'local' ]:
+            return None
+
+        # north-up source at target resolution
+        geo = ds.GetGeoTransform()
+        if geo[ 2 ] != 0 or geo[ 4 ] != 0 or ( geo[ 1 ], geo[ 5 ] ) != tuple( target[ 'res' ] ):
+            return None
+
+        # window origin and size must fall on whole source pixels
+        bbox = target[ 'bbox' ]
+        offsets = [ ( bbox[ 'ulx' ] - geo[ 0 ] ) / geo[ 1 ], ( bbox[ 'uly' ] - geo[ 3 ] ) / geo[ 5 ],
+                    ( bbox[ 'lrx' ] - bbox[ 'ulx' ] ) / geo[ 1 ], ( bbox[ 'lry' ] - bbox[ 'uly' ] ) / geo[ 5 ] ]
+
+        if any( abs( v - round( v ) ) > 1e-6 for v in offsets ):
+            return None
+
+        # window wholly inside image - else warp pads with no data
+        xoff, yoff, xsize, ysize = [ int( round( v ) ) for v in offsets ]
+        if xoff < 0 or yoff < 0 or xoff + xsize > ds.RasterXSize or yoff + ysize > ds.RasterYSize:
+            return None
+
+        return [ xoff, yoff, xsize, ysize ]
+
+
+    def getSourceVrt( self, ds, target, resampling=None, margin=2 ):
+
+        """
+        Placeholder
+        """
+
+        # target and source srs in lon / lat - easting / northing axis order
+        t_srs = osr.SpatialReference(); t_srs.SetFromUserInput( target[ 'srs' ] )
+        s_srs = osr.SpatialReference( wkt=ds.GetProjection() )
+
+        if hasattr( t_srs, 'SetAxisMappingStrategy' ):
+            t_srs.SetAxisMappingStrategy( osr.OAMS_TRADITIONAL_GIS_ORDER )
+            s_srs.SetAxisMappingStrategy( osr.OAMS_TRADITIONAL_GIS_ORDER )
+
+        coord_tx = osr.CoordinateTransformation( t_srs, s_srs )
+
+        # project points along target bbox edges into source pixel coordinates
+        bbox = target[ 'bbox' ]; geo = ds.GetGeoTransform()
+        cols = []; rows = []
+        for i in range( 11 ):
+
+            f = i / 10.0
+            x = bbox[ 'ulx' ] + f * ( bbox[ 'lrx' ] - bbox[ 'ulx' ] ); y = bbox[ 'uly' ] + f * ( bbox[ 'lry' ] - bbox[ 'uly' ] )
+
+            for px, py in [ ( x, bbox[ 'uly' ] ), ( x, bbox[ 'lry' ] ), ( bbox[ 'ulx' ], y ), ( bbox[ 'lrx' ], y ) ]:
+
+                sx, sy, sz = coord_tx.TransformPoint( px, py )
+                cols.append( ( sx - geo[ 0 ] ) / geo[ 1 ] ); rows.append( ( sy - geo[ 3 ] ) / geo[ 5 ] )
+
+        # pad by kernel radius - kernel widens by scale factor when target coarser than source
+        scale = max( 1.0, abs( target[ 'res' ][ 0 ] / geo[ 1 ] ), abs( target[ 'res' ][ 1 ] / geo[ 5 ] ) )
+        pad = int( math.ceil( kernels.get( resampling or 'near', 3 ) * scale ) ) + margin
+
+        # padded source window clamped to image
+        x0 = max( 0, int( math.floor( min( cols ) ) ) - pad ); x1 = min( ds.RasterXSize, int( math.ceil( max( cols ) ) ) + pad )
+        y0 = max( 0, int( math.floor( min( rows ) ) ) - pad ); y1 = min( ds.RasterYSize, int( math.ceil( max( rows ) ) ) + pad )
+
+        if x1 <= x0 or y1 <= y0:
+            return ds
+
+        return gdal.Translate( '', ds, format='VRT', srcWin=[ x0, y0, x1 - x0, y1 - y0 ] )
+
+
+    def clipImage( self, ds, pathname, target, resampling=None ):
+
+        """
+        Placeholder
+        """
+
+        # plain window read where grids align and no cutline
+        cutline = target.get( 'cutline' )
+        if target[ 'srcwin' ] is not None and cutline is None:
+            gdal.Translate( pathname, ds, srcWin=target[ 'srcwin' ] )
+
+        else:
+
+            # warp onto target grid - masked outside aoi polygon if cutline defined
+            kwargs = {}
+            if cutline is not None:
+                kwargs = { 'cutlineDSName' : cutline[ 'source' ], 'cutlineLayer' : cutline[ 'layer' ], 'cutlineWhere' : cutline[ 'where' ] }
+
+            if resampling is not None:
+                kwargs[ 'resampleAlg' ] = resampling
+
+            bbox = target[ 'bbox' ]
+            gdal.Warp( pathname, ds, dstSRS=target[ 'srs' ], xRes=abs( target[ 'res' ][ 0 ] ), yRes=abs( target[ 'res' ][ 1 ] ),
+                        outputBounds=[ bbox[ 'ulx'], bbox[ 'lry' ], bbox[ 'lrx' ], bbox[ 'uly'] ], **kwargs )
+
+        return pathname
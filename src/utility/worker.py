@@ -0,0 +1,31 @@
+import os
+
+from osgeo import gdal
+
+
+# clipper instance owned by pool worker
+clipper = None
+
+def initialiseWorker( cls, threads, kwargs ):
+
+    """
+    Placeholder
+    """
+
+    # split cores between warps of concurrent workers
+    global clipper
+    gdal.SetConfigOption( 'GDAL_NUM_THREADS', str( threads ) )
+    clipper = cls( **kwargs )
+
+    return
+
+
+def clipTask( task ):
+
+    """
+    Placeholder
+    """
+
+    # clip aoi sub-images and record output size
+    outputs = clipper.clip( task )
+    return len( outputs ), sum( os.path.getsize( f ) for f in outputs if os.path.exists( f ) )